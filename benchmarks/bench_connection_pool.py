@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Connections and DNS lookups per hour with separate and shared HTTP pools.
+
+Replays an hour of the request pattern of the integration against the mock
+Bosch API, sped up by --speedup. Per mower the hub client polls the state
+every 30 seconds and the coordinator client polls the calendar, the generic
+data and the alerts every 5 minutes.
+
+- separate: one session per client with the aiohttp defaults, as before
+  (15 s keep-alive, 10 s DNS cache)
+- shared: the single pool of http_session.py with its tuned keep-alive and
+  DNS cache
+
+Every new connection to the real API is a TCP and TLS handshake. The mock
+serves plain HTTP, so only the connections are counted.
+
+    python benchmarks/bench_connection_pool.py --mowers 3 --speedup 120
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+
+import aiohttp
+
+from bench_update_cycle import start_mock_api
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONST = os.path.join(ROOT, "custom_components", "indego", "const.py")
+
+STATE_INTERVAL = 30
+COORDINATOR_INTERVAL = 300
+AIOHTTP_KEEPALIVE_TIMEOUT = 15
+AIOHTTP_DNS_CACHE_TTL = 10
+
+
+def load_const():
+    """Load the constants of the integration without importing Home Assistant."""
+    spec = importlib.util.spec_from_file_location("indego_const", CONST)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def counting_tracer(counts: dict) -> aiohttp.TraceConfig:
+    """Return a trace config counting new connections and DNS lookups."""
+
+    async def on_connection_create_end(session, context, params):
+        counts["connections"] += 1
+
+    async def on_dns_cache_miss(session, context, params):
+        counts["dns_lookups"] += 1
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+    return trace_config
+
+
+def new_session(counts: dict, keepalive_timeout: float, dns_cache_ttl: float) -> aiohttp.ClientSession:
+    """Return a session with the given (already sped up) pool settings."""
+    connector = aiohttp.TCPConnector(keepalive_timeout=keepalive_timeout, ttl_dns_cache=dns_cache_ttl)
+    return aiohttp.ClientSession(connector=connector, trace_configs=[counting_tracer(counts)])
+
+
+async def poll(session: aiohttp.ClientSession, urls: list, interval: float, duration: float):
+    """Request the URLs every interval until the duration is over."""
+    loop = asyncio.get_running_loop()
+    end = loop.time() + duration
+    while loop.time() < end:
+        for url in urls:
+            async with session.get(url) as response:
+                await response.read()
+        await asyncio.sleep(interval)
+
+
+async def replay_hour(args, hub_session, coordinator_session):
+    """Replay one hour of requests of all mowers."""
+    duration = 3600 / args.speedup
+    tasks = []
+    for index in range(args.mowers):
+        base = f"http://localhost:{args.port}/api/v1/alms/SIM{index:06d}"
+        tasks.append(poll(hub_session, [f"{base}/state"], STATE_INTERVAL / args.speedup, duration))
+        tasks.append(
+            poll(
+                coordinator_session,
+                [f"{base}/calendar", base, f"{base}/alerts"],
+                COORDINATOR_INTERVAL / args.speedup,
+                duration,
+            )
+        )
+    await asyncio.gather(*tasks)
+
+
+async def run(args):
+    const = load_const()
+    process = await start_mock_api(args)
+    results = {}
+    try:
+        counts = {"connections": 0, "dns_lookups": 0}
+        sessions = [
+            new_session(counts, AIOHTTP_KEEPALIVE_TIMEOUT / args.speedup, AIOHTTP_DNS_CACHE_TTL / args.speedup)
+            for _ in range(2)
+        ]
+        await replay_hour(args, *sessions)
+        for session in sessions:
+            await session.close()
+        results["separate"] = counts
+
+        counts = {"connections": 0, "dns_lookups": 0}
+        session = new_session(
+            counts,
+            const.HTTP_POOL_KEEPALIVE_TIMEOUT / args.speedup,
+            const.HTTP_POOL_DNS_CACHE_TTL / args.speedup,
+        )
+        await replay_hour(args, session, session)
+        await session.close()
+        results["shared"] = counts
+    finally:
+        process.terminate()
+        await process.wait()
+
+    print(f"mowers: {args.mowers}, one hour replayed in {3600 / args.speedup:.0f} s")
+    print(f"{'pool':<10} {'handshakes/h':>13} {'DNS lookups/h':>14}")
+    for name, counts in results.items():
+        print(f"{name:<10} {counts['connections']:>13} {counts['dns_lookups']:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mowers", type=int, default=3, help="Number of simulated mowers")
+    parser.add_argument("--speedup", type=float, default=120.0, help="Factor to speed up the hour by")
+    parser.add_argument("--port", type=int, default=18082, help="Port for the mock API")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency injected by the mock API in seconds")
+    args = parser.parse_args()
+    args.jitter = args.error_rate = args.throttle_rate = 0.0
+    args.state_interval = 5.0
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Import time of the integration, as Home Assistant pays it on startup.
+
+Imports the integration in a fresh interpreter with -X importtime, --runs
+times, and prints the median cumulative import time, the slowest modules by
+own import time and which of the heavy, lazily imported modules were loaded
+anyway. Run it on the hardware you care about, a Raspberry Pi for example,
+from a Python environment with Home Assistant installed.
+
+    python benchmarks/bench_import_time.py --runs 10
+    python benchmarks/bench_import_time.py --budget-ms 400
+
+With --budget-ms the benchmark fails when the median exceeds the budget or a
+heavy module is loaded on import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["custom_components.indego", "custom_components.indego.coordinator"]
+
+# Only needed for the map, for timezones or for the config flow
+HEAVY_MODULES = [
+    "aiofiles",
+    "xml.etree.ElementTree",
+    "cairosvg",
+    "custom_components.indego.map_renderer",
+    "custom_components.indego.pyindego.indego_async_client",
+]
+
+
+def import_once(modules: list) -> tuple:
+    """Import the modules in a fresh interpreter.
+
+    Returns the own import time per module, the cumulative import time of the
+    modules and their parent packages in ms and the heavy modules loaded.
+    """
+    code = (
+        "import importlib, json, sys\n"
+        f"for name in {modules!r}:\n"
+        "    importlib.import_module(name)\n"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        sys.exit(f"Importing {', '.join(modules)} failed:\n{result.stderr[-2000:]}")
+
+    # The parents of a module are imported first, they count as its cost
+    targets = {".".join(name.split(".")[: index + 1]) for name in modules for index in range(name.count(".") + 1)}
+    own_times = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        own_times[name.strip()] = int(own) / 1000
+        # Nested imports are indented, only count the top level ones
+        if name.strip() in targets and name == f" {name.strip()}":
+            total += int(cumulative) / 1000
+    return own_times, total, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to import in")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when the median import time exceeds it")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to import")
+    args = parser.parse_args()
+
+    totals = []
+    own_times = {}
+    heavy = set()
+    for _ in range(args.runs):
+        times, total, loaded = import_once(args.modules)
+        totals.append(total)
+        for name, own in times.items():
+            own_times.setdefault(name, []).append(own)
+        heavy.update(loaded)
+
+    median = statistics.median(totals)
+    print(f"modules: {', '.join(args.modules)}")
+    print(f"import time: median {median:.1f} ms, min {min(totals):.1f} ms, max {max(totals):.1f} ms ({args.runs} runs)")
+    print(f"\n{'module':<60} {'own ms':>8}")
+    slowest = sorted(own_times.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, values in slowest[: args.top]:
+        print(f"{name:<60} {statistics.median(values):>8.1f}")
+    print(f"\nheavy modules loaded on import: {', '.join(sorted(heavy)) or 'none'}")
+
+    if args.budget_ms is not None and (median > args.budget_ms or heavy):
+        sys.exit(f"Import time budget of {args.budget_ms:.0f} ms exceeded or heavy modules loaded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for rendering the mowing trail on the camera map.
+
+Compares the cost of a position update of the incremental SvgMapRenderer with
+rewriting the full SVG document per update, for a synthetic map of the given
+size and a mowing session of the given number of positions.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTEGRATION = os.path.join(ROOT, "custom_components", "indego")
+
+
+def load_renderer():
+    """Load the map renderer module without importing Home Assistant."""
+    package = types.ModuleType("indego")
+    package.__path__ = [INTEGRATION]
+    sys.modules["indego"] = package
+    for name in ("const", "map_renderer"):
+        spec = importlib.util.spec_from_file_location(
+            f"indego.{name}", os.path.join(INTEGRATION, f"{name}.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[f"indego.{name}"] = module
+        spec.loader.exec_module(module)
+    return sys.modules["indego.map_renderer"]
+
+
+def synthetic_map(size_kb: int) -> str:
+    """Return an SVG map of roughly the given size."""
+    cell = '<rect x="{0}" y="{0}" width="10" height="10" fill="#CCCCCC" />'
+    cells = []
+    length = 0
+    index = 0
+    while length < size_kb * 1024:
+        cells.append(cell.format(index % 1000))
+        length += len(cells[-1])
+        index += 1
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg"><g fill="#FAFAFA">'
+        + "".join(cells)
+        + '</g><path id="mower" d="M0 0" /></svg>'
+    )
+
+
+def full_rewrite(svg_text: str, positions) -> None:
+    """Rewrite the whole document per update, as the camera did before."""
+    path_svg = ""
+    last = None
+    for xpos, ypos in positions:
+        text = svg_text.replace("#FAFAFA", "transparent").replace("#CCCCCC", "transparent")
+        if last:
+            path_svg += (
+                f'<line x1="{last[0]}" y1="{last[1]}" x2="{xpos}" y2="{ypos}" '
+                'stroke="#0000FF" stroke-width="6" stroke-linecap="round" />'
+            )
+        last = (xpos, ypos)
+        text = text.replace('<path id="mower"', "<!-- removed mower -->")
+        text.replace("</svg>", path_svg + "</svg>")
+
+
+def incremental(renderer_module, svg_text: str, positions) -> None:
+    """Render each update with the incremental renderer."""
+    renderer = renderer_module.SvgMapRenderer()
+    renderer.set_base_map(svg_text)
+    for position in positions:
+        renderer.add_position(*position)
+        renderer.render(position)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--map-kb", type=int, default=2048, help="Size of the base map in KiB")
+    parser.add_argument("--positions", type=int, default=500, help="Position updates per session")
+    args = parser.parse_args()
+
+    renderer_module = load_renderer()
+    svg_text = synthetic_map(args.map_kb)
+    positions = [(index % 700, (index * 7) % 500) for index in range(args.positions)]
+
+    for name, case in (
+        ("full rewrite", lambda: full_rewrite(svg_text, positions)),
+        ("incremental", lambda: incremental(renderer_module, svg_text, positions)),
+    ):
+        start = time.perf_counter()
+        case()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<13} {elapsed / args.positions * 1e3:8.3f} ms per update")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Scale test for many mowers in one Home Assistant instance.
+
+Every config entry gets its own API client, a longpoll state stream and a
+coordinator poll. This runs that per mower hub for 1, 10, 100 and 1000
+simulated mowers against benchmarks/mock_bosch_api.py. All hubs share one
+aiohttp session with the connection limits of the Home Assistant session.
+
+By default a hub is set up as async_setup_entry does: the API client of the
+integration and its IndegoDataUpdateCoordinator, which runs the state stream,
+falls back to polling while the stream fails and polls on the interval of its
+cadence. With --client manager or pyindego a hub is the IndegoApiManager or
+the bare pyindego client, driven by a longpoll loop and a poll every
+--interval seconds. Every --mowers-per-account mowers share the rate limiter
+of a Bosch account. Every level runs in a fresh process and reports:
+
+- the event loop lag, as the overshoot of a 50 ms probe timer
+- the resident memory per hub
+- the aggregate request rate and error count
+- the calls joined with an identical request in flight
+- the hubs with a working state stream at the end
+- the time requests waited for a free connection of the pool
+- the startup time until every hub finished its first refresh
+
+    python benchmarks/bench_scale.py --levels 1,10,100,1000 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from bench_update_cycle import (
+    DEFAULT_PYINDEGO,
+    async_create_hass,
+    create_hubs,
+    hub_metrics,
+    joined_calls,
+    load_client,
+    load_integration,
+    quantile,
+    start_mock_api,
+    update_cycle,
+)
+
+# Connection limits of the shared Home Assistant client session.
+HA_CONNECTION_LIMIT = 4096
+HA_CONNECTION_LIMIT_PER_HOST = 100
+PROBE_INTERVAL = 0.05
+# STATE_STREAM_MIN_INTERVAL of the integration in seconds.
+STATE_STREAM_MIN_INTERVAL = 1.0
+
+
+def rss_bytes() -> int:
+    """Return the resident memory of this process."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak instead of current memory, in KiB on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def pool_tracer(queue_waits: list) -> aiohttp.TraceConfig:
+    """Return a trace config recording how long requests wait for a connection."""
+
+    async def on_queued_start(session, context, params):
+        context.queued = time.perf_counter()
+
+    async def on_queued_end(session, context, params):
+        queue_waits.append(time.perf_counter() - context.queued)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_queued_start.append(on_queued_start)
+    trace_config.on_connection_queued_end.append(on_queued_end)
+    return trace_config
+
+
+async def probe_loop_lag(lags: list):
+    """Record how late a periodic timer fires."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(loop.time() - expected, 0.0))
+
+
+async def state_stream(args, hub):
+    """Keep a longpoll state request open, as the coordinator does."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        try:
+            if args.client == "manager":
+                await hub.get_state(longpoll=True)
+            else:
+                await hub.update_state(longpoll=True, longpoll_timeout=args.longpoll_timeout)
+        except Exception:  # pylint: disable=broad-except
+            pass
+        # Failed longpolls return at once, wait before the next one as the coordinator does.
+        elapsed = loop.time() - started
+        if elapsed < STATE_STREAM_MIN_INTERVAL:
+            await asyncio.sleep(STATE_STREAM_MIN_INTERVAL - elapsed)
+
+
+async def coordinator_poll(args, hub):
+    """Poll the secondary data of the coordinator on its interval."""
+    while True:
+        await asyncio.sleep(args.interval)
+        if args.client == "manager":
+            await hub.update_all()
+        else:
+            await asyncio.gather(
+                hub.update_calendar(),
+                hub.update_operating_data(),
+                hub.update_alerts(),
+            )
+
+
+def start_hub(args, hub, handles: list) -> None:
+    """Start the state stream and the polls of a hub."""
+    if args.client == "coordinator":
+        # A listener makes the coordinator schedule its polls, as the entities do.
+        handles.append(hub.async_add_listener(lambda: None))
+        hub.async_start_state_stream()
+        return
+    handles.append(asyncio.create_task(state_stream(args, hub)))
+    handles.append(asyncio.create_task(coordinator_poll(args, hub)))
+
+
+async def stop_hubs(args, hubs: list, handles: list) -> None:
+    """Stop the state streams and the polls of the hubs."""
+    if args.client == "coordinator":
+        for remove_listener in handles:
+            remove_listener()
+        await asyncio.gather(*(hub.async_stop_state_stream() for hub in hubs), return_exceptions=True)
+        return
+    for task in handles:
+        task.cancel()
+    await asyncio.gather(*handles, return_exceptions=True)
+
+
+async def run_level(args) -> dict:
+    """Run one level in this process and return its measurements."""
+    modules = {
+        "coordinator": ("api", "coordinator"),
+        "manager": ("api_manager", "rate_limiter"),
+        "pyindego": (),
+    }[args.client]
+    integration = load_integration(*modules)
+    if args.client != "coordinator":
+        args.client_class = load_client(args.pyindego)
+    args.accounts = math.ceil(args.mowers / args.mowers_per_account)
+    process = await start_mock_api(args, "--max-longpoll", str(args.longpoll_timeout))
+    config_dir = tempfile.TemporaryDirectory()
+    hass = await async_create_hass(config_dir.name) if modules else None
+    queue_waits = []
+    lags = []
+    hubs = []
+    handles = []
+    connector = aiohttp.TCPConnector(
+        limit=HA_CONNECTION_LIMIT, limit_per_host=args.limit_per_host
+    )
+    session = aiohttp.ClientSession(connector=connector, trace_configs=[pool_tracer(queue_waits)])
+    try:
+        probe = asyncio.create_task(probe_loop_lag(lags))
+        rss_start = rss_bytes()
+        hubs = create_hubs(integration, hass, args, session)
+
+        # Home Assistant sets up all entries at once, each with a first refresh.
+        start = time.perf_counter()
+        await asyncio.gather(*(update_cycle(args, hub) for hub in hubs))
+        startup = time.perf_counter() - start
+
+        for hub in hubs:
+            start_hub(args, hub, handles)
+
+        requests_start = sum(hub_metrics(args, hub).total_requests for hub in hubs)
+        errors_start = sum(hub_metrics(args, hub).total_errors for hub in hubs)
+        coalesced_start = joined_calls(args, hubs)
+        lags.clear()
+        queue_waits.clear()
+        cpu_start = time.process_time()
+        await asyncio.sleep(args.duration)
+        cpu = time.process_time() - cpu_start
+        rss_end = rss_bytes()
+        requests = sum(hub_metrics(args, hub).total_requests for hub in hubs) - requests_start
+        errors = sum(hub_metrics(args, hub).total_errors for hub in hubs) - errors_start
+        coalesced = joined_calls(args, hubs) - coalesced_start
+        streaming = sum(1 for hub in hubs if getattr(hub, "streaming", False))
+        probe.cancel()
+    finally:
+        await stop_hubs(args, hubs, handles)
+        await session.close()
+        if hass is not None:
+            await hass.async_stop(force=True)
+        config_dir.cleanup()
+        process.terminate()
+        await process.wait()
+
+    return {
+        "mowers": args.mowers,
+        "startup": startup,
+        "requests_per_second": requests / args.duration,
+        "errors": errors,
+        "coalesced": coalesced,
+        "streaming": streaming,
+        "cpu_share": cpu / args.duration,
+        "lag_p50": quantile(lags, 0.5),
+        "lag_p99": quantile(lags, 0.99),
+        "lag_max": max(lags, default=0.0),
+        "memory_per_hub": (rss_end - rss_start) / args.mowers,
+        "queued": len(queue_waits),
+        "queue_wait_p99": quantile(queue_waits, 0.99),
+    }
+
+
+def run_levels(args):
+    """Run every level in a fresh process and print a summary table."""
+    print(
+        f"{'mowers':>7} {'startup':>9} {'req/s':>8} {'errors':>7} {'joined':>7} {'stream':>7} {'cpu':>6} "
+        f"{'lag p50':>9} {'lag p99':>9} {'lag max':>9} {'KiB/hub':>9} {'queued':>7} {'wait p99':>9}",
+        flush=True,
+    )
+    for mowers in args.levels:
+        command = [
+            sys.executable, os.path.abspath(__file__),
+            "--level", str(mowers),
+            "--client", args.client,
+            "--pyindego", args.pyindego,
+            "--mowers-per-account", str(args.mowers_per_account),
+            "--duration", str(args.duration),
+            "--interval", str(args.interval),
+            "--longpoll-timeout", str(args.longpoll_timeout),
+            "--limit-per-host", str(args.limit_per_host),
+            "--port", str(args.port),
+            "--latency", str(args.latency),
+            "--jitter", str(args.jitter),
+            "--error-rate", str(args.error_rate),
+            "--throttle-rate", str(args.throttle_rate),
+            "--state-interval", str(args.state_interval),
+        ]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{result['mowers']:>7} {result['startup']:>8.2f}s {result['requests_per_second']:>8.1f} "
+            f"{result['errors']:>7} {result['coalesced']:>7} {result['streaming']:>7} {result['cpu_share']:>6.0%} "
+            f"{result['lag_p50'] * 1e3:>7.1f}ms {result['lag_p99'] * 1e3:>7.1f}ms {result['lag_max'] * 1e3:>7.1f}ms "
+            f"{result['memory_per_hub'] / 1024:>9.0f} {result['queued']:>7} {result['queue_wait_p99'] * 1e3:>7.0f}ms",
+            flush=True,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,10,100,1000", help="Comma separated numbers of mowers")
+    parser.add_argument("--level", type=int, help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--client", choices=("coordinator", "manager", "pyindego"), default="coordinator", help="Client path of a hub"
+    )
+    parser.add_argument("--pyindego", default=DEFAULT_PYINDEGO, help="Path of the pyindego package")
+    parser.add_argument("--mowers-per-account", type=int, default=1, help="Mowers sharing a Bosch account")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per level")
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds between polls of the manager and pyindego hubs")
+    parser.add_argument("--longpoll-timeout", type=int, default=30, help="Longpoll timeout in seconds")
+    parser.add_argument(
+        "--limit-per-host", type=int, default=HA_CONNECTION_LIMIT_PER_HOST, help="Connections per host of the session"
+    )
+    parser.add_argument("--port", type=int, default=18081, help="Port for the mock API")
+    parser.add_argument("--latency", type=float, default=0.1, help="Latency injected by the mock API in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--state-interval", type=float, default=5.0, help="Seconds between simulated state changes")
+    args = parser.parse_args()
+
+    if args.level:
+        args.mowers = args.level
+        print(json.dumps(asyncio.run(run_level(args))))
+    else:
+        args.levels = [int(level) for level in args.levels.split(",")]
+        run_levels(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for decoding Bosch API payloads into pyIndego state classes.
+
+Measures the cost of building State, OperatingData and Calendar objects from
+raw API payloads. Point --pyindego at another checkout of the pyindego package
+(for example a git worktree of an older revision) to compare before and after.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import timeit
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PYINDEGO = os.path.join(ROOT, "custom_components", "indego", "pyindego")
+
+STATE_PAYLOAD = {
+    "state": 513,
+    "map_update_available": True,
+    "mowed": 42,
+    "mowmode": 0,
+    "error": 0,
+    "xPos": 12,
+    "yPos": 30,
+    "runtime": {
+        "total": {"operate": 123456, "charge": 23456},
+        "session": {"operate": 34, "charge": 2},
+    },
+    "mapsvgcache_ts": 1690000000,
+    "svg_xPos": 100,
+    "svg_yPos": 200,
+    "config_change": False,
+    "mow_trig": False,
+}
+
+OPERATING_DATA_PAYLOAD = {
+    "hmiKeys": "1234",
+    "battery": {
+        "percent": 330,
+        "voltage": 33.0,
+        "cycles": 123,
+        "discharge": 0.0,
+        "ambient_temp": 15,
+        "battery_temp": 20,
+    },
+    "garden": {
+        "id": 7,
+        "name": 1,
+        "signal_id": 1,
+        "size": 600,
+        "inner_bounds": 2,
+        "cuts": 12,
+        "runtime": 123456,
+        "charge": 23456,
+        "bumps": 1234,
+        "stops": 12,
+        "last_mow": 1,
+        "map_cell_size": 100,
+    },
+    "runtime": {
+        "total": {"operate": 123456, "charge": 23456},
+        "session": {"operate": 34, "charge": 2},
+    },
+}
+
+CALENDAR_PAYLOAD = {
+    "cal": 1,
+    "days": [
+        {
+            "day": day,
+            "slots": [
+                {"En": True, "StHr": 8, "StMin": 0, "EnHr": 12, "EnMin": 0},
+                {"En": True, "StHr": 14, "StMin": 30, "EnHr": 18, "EnMin": 0},
+            ],
+        }
+        for day in range(7)
+    ],
+}
+
+
+def load_states(path: str):
+    """Load the states module of a pyindego package without importing its client."""
+    package = types.ModuleType("pyindego")
+    package.__path__ = [path]
+    sys.modules["pyindego"] = package
+    for name in ("version", "const", "helpers", "states"):
+        spec = importlib.util.spec_from_file_location(
+            f"pyindego.{name}", os.path.join(path, f"{name}.py")
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[f"pyindego.{name}"] = module
+        spec.loader.exec_module(module)
+    return sys.modules["pyindego.states"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pyindego", default=DEFAULT_PYINDEGO, help="Path of the pyindego package")
+    parser.add_argument("--number", type=int, default=20000, help="Payloads per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs, the best one is reported")
+    args = parser.parse_args()
+
+    states = load_states(args.pyindego)
+    cases = {
+        "State": lambda: states.State(**STATE_PAYLOAD),
+        "OperatingData": lambda: states.OperatingData(**OPERATING_DATA_PAYLOAD),
+        "Calendar": lambda: states.Calendar(**CALENDAR_PAYLOAD),
+    }
+
+    print(f"pyindego: {args.pyindego}")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=args.number, repeat=args.repeat))
+        print(f"{name:<14} {best / args.number * 1e6:8.2f} us per payload")
+
+
+if __name__ == "__main__":
+    main()
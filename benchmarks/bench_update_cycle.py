@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the update cycle against the mock Bosch API.
+
+Starts benchmarks/mock_bosch_api.py in a subprocess and runs update cycles for
+N simulated mowers on a shared aiohttp session, through one of three paths:
+
+- coordinator: the API client of the integration (api/__init__.py) and its
+  IndegoDataUpdateCoordinator, as async_setup_entry sets them up. A cycle is
+  a coordinator refresh. With --stream the longpoll state stream runs next
+  to it, the refresh only polls the state while the stream is down.
+- manager: the IndegoApiManager around the pyindego client. A cycle runs
+  --callers concurrent update_all calls per mower, which the manager joins.
+- pyindego: the bare pyindego client, a cycle is one update_all.
+
+The mowers are spread over --accounts Bosch accounts, the mowers of an
+account share its rate limiter. Per cycle it reports the requests per mower,
+the p50/p99 request latency seen by the clients, the joined calls and the
+CPU time of the client process. Longpolls are counted, but left out of the
+latencies. Point --pyindego at another checkout of the pyindego package to
+compare revisions, it is used by the manager and pyindego paths.
+
+    python benchmarks/bench_update_cycle.py --mowers 10 --cycles 20 --latency 0.05
+    python benchmarks/bench_update_cycle.py --client manager --callers 4 --accounts 1
+"""
+import argparse
+import asyncio
+import base64
+import importlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTEGRATION = os.path.join(ROOT, "custom_components", "indego")
+DEFAULT_PYINDEGO = os.path.join(INTEGRATION, "pyindego")
+MOCK_API = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_bosch_api.py")
+
+
+def load_client(path: str):
+    """Load the async client of a pyindego package without running its __init__."""
+    package = types.ModuleType("pyindego")
+    package.__path__ = [path]
+    sys.modules["pyindego"] = package
+    return importlib.import_module("pyindego.indego_async_client").IndegoAsyncClient
+
+
+def load_integration(*modules: str) -> types.SimpleNamespace:
+    """Load modules of the integration without running its __init__."""
+    for name, path in (("custom_components", os.path.dirname(INTEGRATION)), ("custom_components.indego", INTEGRATION)):
+        package = types.ModuleType(name)
+        package.__path__ = [path]
+        sys.modules[name] = package
+    return types.SimpleNamespace(
+        **{module: importlib.import_module(f"custom_components.indego.{module}") for module in modules}
+    )
+
+
+async def async_create_hass(config_dir: str):
+    """Return a Home Assistant instance for the clients, it is not started."""
+    from homeassistant.core import HomeAssistant
+
+    return HomeAssistant(config_dir)
+
+
+def account_token(account: int) -> str:
+    """Return an access token of an account, the rate limiter is shared by its claims."""
+    claims = base64.urlsafe_b64encode(json.dumps({"oid": f"account{account}"}).encode())
+    return f"header.{claims.rstrip(b'=').decode()}.signature"
+
+
+def create_hubs(integration, hass, args, session) -> list:
+    """Return the client of every mower, as the chosen client path sets it up."""
+    api_url = f"http://127.0.0.1:{args.port}/api/v1/"
+    hubs = []
+    for index in range(args.mowers):
+        token = account_token(index % args.accounts)
+        serial = f"SIM{index:06d}"
+        if args.client == "coordinator":
+            api = integration.api.IndegoApiClient(
+                hass, token=token, serial=serial, api_url=api_url, session=session
+            )
+            hubs.append(integration.coordinator.IndegoDataUpdateCoordinator(hass, api))
+            continue
+
+        client = args.client_class(token=token, serial=serial, api_url=api_url, session=session)
+        if args.client == "manager":
+            client = integration.api_manager.IndegoApiManager(
+                hass,
+                client,
+                integration.rate_limiter.async_get_rate_limiter(
+                    hass, integration.rate_limiter.account_id_from_token(token)
+                ),
+            )
+        hubs.append(client)
+    return hubs
+
+
+def hub_metrics(args, hub):
+    """Return the metrics registry of a hub."""
+    if args.client == "coordinator":
+        return hub.api.metrics
+    if args.client == "manager":
+        return hub.api_client.metrics
+    return hub.metrics
+
+
+def joined_calls(args, hubs) -> int:
+    """Return the calls joined with an identical request in flight, over all hubs."""
+    return sum(request.coalesced for hub in hubs for request in hub_metrics(args, hub).requests.values())
+
+
+def expire(hub) -> None:
+    """Make every data class of a coordinator due, its client cache included."""
+    hub._last_fetch.clear()  # pylint: disable=protected-access
+    hub.api._cache.clear()  # pylint: disable=protected-access
+
+
+async def update_cycle(args, hub, force: bool = False) -> None:
+    """Run one update cycle of a hub."""
+    if args.client == "coordinator":
+        if force:
+            expire(hub)
+        await hub.async_refresh()
+    elif args.client == "manager":
+        await asyncio.gather(*(hub.update_all(force=force) for _ in range(args.callers)))
+    else:
+        await hub.update_all(force=force)
+
+
+async def start_mock_api(args, *extra_args: str) -> asyncio.subprocess.Process:
+    """Start the mock API in a subprocess, so its CPU time is not measured."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        MOCK_API,
+        "--port", str(args.port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate),
+        "--state-interval", str(args.state_interval),
+        "--report-interval", "0",
+        *extra_args,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    await process.stdout.readline()
+    return process
+
+
+def latency_tracer(latencies: list, longpolls: list) -> aiohttp.TraceConfig:
+    """Return a trace config recording the duration of every request, longpolls apart."""
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        duration = time.perf_counter() - context.start
+        if params.url.query.get("longpoll") == "true":
+            longpolls.append(duration)
+        else:
+            latencies.append(duration)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+def quantile(values: list, share: float) -> float:
+    """Return the quantile of a list of values."""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[round(share * 100) - 1]
+
+
+async def run(args):
+    modules = {
+        "coordinator": ("api", "coordinator"),
+        "manager": ("api_manager", "rate_limiter"),
+        "pyindego": (),
+    }[args.client]
+    integration = load_integration(*modules)
+    if args.client != "coordinator":
+        args.client_class = load_client(args.pyindego)
+    process = await start_mock_api(args, "--max-longpoll", str(args.longpoll_timeout))
+    latencies = []
+    longpolls = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_create_hass(config_dir) if modules else None
+        try:
+            async with aiohttp.ClientSession(trace_configs=[latency_tracer(latencies, longpolls)]) as session:
+                hubs = create_hubs(integration, hass, args, session)
+
+                # The first cycle fills the caches, it is not measured.
+                await asyncio.gather(*(update_cycle(args, hub) for hub in hubs))
+                if args.stream and args.client == "coordinator":
+                    for hub in hubs:
+                        hub.async_start_state_stream()
+                latencies.clear()
+                longpolls.clear()
+                coalesced_start = joined_calls(args, hubs)
+                errors_start = sum(hub_metrics(args, hub).total_errors for hub in hubs)
+
+                cycle_times = []
+                cpu_start = time.process_time()
+                for _ in range(args.cycles):
+                    start = time.perf_counter()
+                    await asyncio.gather(*(update_cycle(args, hub, args.force) for hub in hubs))
+                    cycle_times.append(time.perf_counter() - start)
+                cpu = time.process_time() - cpu_start
+                coalesced = joined_calls(args, hubs) - coalesced_start
+                errors = sum(hub_metrics(args, hub).total_errors for hub in hubs) - errors_start
+                streaming = sum(1 for hub in hubs if getattr(hub, "streaming", False))
+
+                if args.client == "coordinator":
+                    await asyncio.gather(*(hub.async_stop_state_stream() for hub in hubs))
+        finally:
+            if hass is not None:
+                await hass.async_stop(force=True)
+            process.terminate()
+            await process.wait()
+
+    cycles = args.cycles
+    mower_cycles = cycles * args.mowers
+    print(f"client: {args.client}" + (f", pyindego: {args.pyindego}" if args.client != "coordinator" else ""))
+    print(
+        f"mowers: {args.mowers}, accounts: {args.accounts}, cycles: {cycles}, latency: {args.latency}s, "
+        f"errors: {args.error_rate}, 429: {args.throttle_rate}"
+    )
+    print(f"requests per mower and cycle  {len(latencies) / mower_cycles:8.1f}")
+    print(f"request latency p50           {quantile(latencies, 0.5) * 1e3:8.1f} ms")
+    print(f"request latency p99           {quantile(latencies, 0.99) * 1e3:8.1f} ms")
+    print(f"request errors per cycle      {errors / cycles:8.1f}")
+    print(f"joined calls per mower cycle  {coalesced / mower_cycles:8.1f}")
+    if args.stream and args.client == "coordinator":
+        print(f"longpolls per mower and cycle {len(longpolls) / mower_cycles:8.1f}")
+        print(f"mowers streaming at the end   {streaming:8d}")
+    print(f"cycle duration p50            {quantile(cycle_times, 0.5) * 1e3:8.1f} ms")
+    print(f"client CPU per cycle          {cpu / cycles * 1e3:8.1f} ms")
+    print(f"client CPU per mower cycle    {cpu / mower_cycles * 1e3:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--client", choices=("coordinator", "manager", "pyindego"), default="coordinator", help="Client path to run"
+    )
+    parser.add_argument("--pyindego", default=DEFAULT_PYINDEGO, help="Path of the pyindego package")
+    parser.add_argument("--mowers", type=int, default=10, help="Number of simulated mowers")
+    parser.add_argument("--accounts", type=int, default=1, help="Number of Bosch accounts the mowers are spread over")
+    parser.add_argument("--callers", type=int, default=3, help="Concurrent update_all calls per mower of the manager")
+    parser.add_argument("--stream", action="store_true", help="Run the state stream of the coordinators")
+    parser.add_argument("--longpoll-timeout", type=int, default=30, help="Longest longpoll wait of the mock API")
+    parser.add_argument("--cycles", type=int, default=20, help="Measured update cycles")
+    parser.add_argument("--port", type=int, default=18080, help="Port for the mock API")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency injected by the mock API in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--state-interval", type=float, default=1.0, help="Seconds between simulated state changes")
+    parser.add_argument("--force", action="store_true", help="Refresh every endpoint in every cycle")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""Offline stand-in for the Bosch Indego API (api.indego.iot.bosch-si.com).
+
+Serves the recorded payloads of benchmarks/fixtures/bosch_api.json for any
+serial, including /state with longpoll, /map and the PUT and DELETE calls of
+the clients. Latency, 500 errors and 429 responses with Retry-After can be
+injected to exercise the retry paths. Every request is counted per endpoint.
+
+Run it standalone and point a client at http://127.0.0.1:<port>/api/v1/:
+
+    python benchmarks/mock_bosch_api.py --port 8080 --latency 0.2 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bosch_api.json")
+API_PREFIX = "/api/v1"
+
+# Mowing states the simulated mowers cycle through (mowing, returning to dock, docked).
+SIMULATED_STATES = (513, 513, 513, 1025, 258)
+
+
+def load_fixtures(path: str = FIXTURES) -> dict:
+    """Load the recorded API payloads."""
+    with open(path, encoding="utf-8") as fixtures_file:
+        return json.load(fixtures_file)
+
+
+def _with_serial(payload, serial: str):
+    """Return the payload with the {serial} placeholders replaced."""
+    return json.loads(json.dumps(payload).replace("{serial}", serial))
+
+
+def synthetic_map(size_kb: int) -> bytes:
+    """Return an SVG map of roughly the given size."""
+    cells = []
+    length = 0
+    index = 0
+    while length < size_kb * 1024:
+        cells.append(f'<rect x="{index % 700}" y="{(index * 7) % 500}" width="10" height="10" fill="#CCCCCC" />')
+        length += len(cells[-1])
+        index += 1
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 700 500"><g fill="#FAFAFA">'
+        + "".join(cells)
+        + '</g><path id="mower" d="M0 0" /></svg>'
+    ).encode("utf-8")
+
+
+class SimulatedMower:
+    """State of one simulated mower, moving while it is mowing."""
+
+    def __init__(self, serial: str, fixtures: dict):
+        """Initialize the mower from the fixtures."""
+        self.serial = serial
+        self.state = _with_serial(fixtures["state"], serial)
+        self.changed = asyncio.Event()
+        self.ticks = 0
+
+    def tick(self):
+        """Advance the simulation by one step and wake the longpoll waiters."""
+        self.ticks += 1
+        self.state["state"] = SIMULATED_STATES[(self.ticks // 10) % len(SIMULATED_STATES)]
+        if self.state["state"] == 513:
+            self.state["svg_xPos"] = 100 + (self.ticks * 13) % 500
+            self.state["svg_yPos"] = 100 + (self.ticks * 7) % 300
+            self.state["mowed"] = (self.state["mowed"] + 1) % 101
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class MockBoschApi:
+    """aiohttp application imitating the Bosch API."""
+
+    def __init__(
+        self,
+        fixtures: dict = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        state_interval: float = 5.0,
+        max_longpoll: float = 30.0,
+        map_kb: int = 256,
+        seed: int = None,
+    ):
+        """Initialize the mock API."""
+        self.fixtures = fixtures or load_fixtures()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.state_interval = state_interval
+        self.max_longpoll = max_longpoll
+        self.map_svg = synthetic_map(map_kb)
+        self.mowers: dict[str, SimulatedMower] = {}
+        self.requests = Counter()
+        self.responses = Counter()
+        self._injected: list[list] = []
+        self._random = random.Random(seed)
+        self._ticker = None
+
+    def inject(self, endpoint: str, status: int, count: int = 1, retry_after: int = None):
+        """Answer the next count requests of an endpoint (e.g. "GET state") with status."""
+        self._injected.append([endpoint, status, count, retry_after])
+
+    def mower(self, serial: str) -> SimulatedMower:
+        """Return the simulated mower of a serial, created on first use."""
+        mower = self.mowers.get(serial)
+        if mower is None:
+            mower = self.mowers[serial] = SimulatedMower(serial, self.fixtures)
+        return mower
+
+    def reset_counters(self):
+        """Reset the request and response counters."""
+        self.requests.clear()
+        self.responses.clear()
+
+    def application(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application(middlewares=[self._middleware])
+        routes = [
+            ("GET", "/alms", self._alms),
+            ("GET", "/alms/{serial}", self._fixture("generic_data")),
+            ("GET", "/alms/{serial}/state", self._get_state),
+            ("PUT", "/alms/{serial}/state", self._put),
+            ("GET", "/alms/{serial}/alerts", self._fixture("alerts")),
+            ("GET", "/alms/{serial}/map", self._map),
+            ("GET", "/alms/{serial}/operatingData", self._fixture("operating_data")),
+            ("GET", "/alms/{serial}/calendar", self._fixture("calendar")),
+            ("PUT", "/alms/{serial}/calendar", self._put),
+            ("GET", "/alms/{serial}/config", self._fixture("config")),
+            ("GET", "/alms/{serial}/network", self._fixture("network")),
+            ("GET", "/alms/{serial}/security", self._fixture("security")),
+            ("GET", "/alms/{serial}/setup", self._fixture("setup")),
+            ("GET", "/alms/{serial}/updates", self._fixture("updates")),
+            ("GET", "/alms/{serial}/predictive/calendar", self._fixture("predictive_calendar")),
+            ("PUT", "/alms/{serial}/predictive/calendar", self._put),
+            ("GET", "/alms/{serial}/predictive/schedule", self._fixture("predictive_schedule")),
+            ("GET", "/alms/{serial}/predictive/lastcutting", self._fixture("last_cutting")),
+            ("GET", "/alms/{serial}/predictive/nextcutting", self._fixture("next_cutting")),
+            ("GET", "/alms/{serial}/predictive/location", self._fixture("location")),
+            ("PUT", "/alms/{serial}/predictive", self._put),
+            ("PUT", "/alerts/{alert_id}", self._put),
+            ("DELETE", "/alerts/{alert_id}", self._put),
+            ("DELETE", "/alerts/{alert_id}/", self._put),
+            ("GET", "/users/{user_id}", self._fixture("user")),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, API_PREFIX + path, handler)
+        app.on_startup.append(self._start_ticker)
+        app.on_cleanup.append(self._stop_ticker)
+        return app
+
+    async def _start_ticker(self, app):
+        self._ticker = asyncio.create_task(self._tick())
+
+    async def _stop_ticker(self, app):
+        self._ticker.cancel()
+
+    async def _tick(self):
+        """Advance all simulated mowers every state interval."""
+        while True:
+            await asyncio.sleep(self.state_interval)
+            for mower in list(self.mowers.values()):
+                mower.tick()
+
+    @staticmethod
+    def _endpoint(request: web.Request) -> str:
+        """Return the endpoint name of a request, e.g. "GET state"."""
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        name = route[len(API_PREFIX):].replace("/alms/{serial}", "") or "/"
+        if request.query.get("longpoll") == "true":
+            name += "?longpoll"
+        return f"{request.method} {name.strip('/') or 'generic_data'}"
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        """Count the request and apply the injected latency and errors."""
+        endpoint = self._endpoint(request)
+        self.requests[endpoint] += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+        for injected in self._injected:
+            if injected[0] == endpoint and injected[2] > 0:
+                injected[2] -= 1
+                return self._error(endpoint, injected[1], injected[3])
+        self._injected = [injected for injected in self._injected if injected[2] > 0]
+
+        if self.throttle_rate and self._random.random() < self.throttle_rate:
+            return self._error(endpoint, 429)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self._error(endpoint, 500)
+
+        response = await handler(request)
+        self.responses[(endpoint, response.status)] += 1
+        return response
+
+    def _error(self, endpoint: str, status: int, retry_after: int = None) -> web.Response:
+        self.responses[(endpoint, status)] += 1
+        headers = {}
+        if status == 429:
+            headers["Retry-After"] = str(retry_after if retry_after is not None else self.retry_after)
+        return web.Response(status=status, headers=headers)
+
+    @staticmethod
+    def _json(request: web.Request, payload) -> web.Response:
+        """Return a JSON response with an ETag, answering 304 when it matches."""
+        body = json.dumps(payload).encode("utf-8")
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    def _fixture(self, name: str):
+        """Return a handler serving a fixture."""
+        payloads = {}
+
+        async def handler(request: web.Request) -> web.Response:
+            serial = request.match_info.get("serial", "")
+            payload = payloads.get(serial)
+            if payload is None:
+                payload = payloads[serial] = _with_serial(self.fixtures[name], serial)
+            return self._json(request, payload)
+
+        return handler
+
+    async def _alms(self, request: web.Request) -> web.Response:
+        return self._json(request, [{"alm_sn": serial} for serial in self.mowers] or self.fixtures["alms"])
+
+    async def _get_state(self, request: web.Request) -> web.Response:
+        mower = self.mower(request.match_info["serial"])
+        if request.query.get("longpoll") == "true":
+            timeout = min(float(request.query.get("timeout", self.max_longpoll)), self.max_longpoll)
+            try:
+                await asyncio.wait_for(mower.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._json(request, copy.copy(mower.state))
+
+    async def _map(self, request: web.Request) -> web.Response:
+        self.mower(request.match_info["serial"])
+        return web.Response(body=self.map_svg, content_type="image/svg+xml")
+
+    async def _put(self, request: web.Request) -> web.Response:
+        if request.can_read_body:
+            await request.read()
+        return web.Response(status=200, body=b"{}", content_type="application/json")
+
+
+async def serve(api: MockBoschApi, host: str, port: int) -> web.AppRunner:
+    """Start the mock API, returns the runner to clean it up with."""
+    runner = web.AppRunner(api.application())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def _main(args):
+    api = MockBoschApi(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        state_interval=args.state_interval,
+        max_longpoll=args.max_longpoll,
+        map_kb=args.map_kb,
+        seed=args.seed,
+    )
+    runner = await serve(api, args.host, args.port)
+    print(f"Mock Bosch API listening on http://{args.host}:{args.port}{API_PREFIX}/", flush=True)
+    try:
+        if not args.report_interval:
+            await asyncio.Event().wait()
+        while True:
+            await asyncio.sleep(args.report_interval)
+            if api.requests:
+                print(f"{time.strftime('%X')} {sum(api.requests.values())} requests: {dict(api.requests)}", flush=True)
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After of the 429 responses in seconds")
+    parser.add_argument("--state-interval", type=float, default=5.0, help="Seconds between simulated state changes")
+    parser.add_argument("--max-longpoll", type=float, default=30.0, help="Longest longpoll wait in seconds")
+    parser.add_argument("--map-kb", type=int, default=256, help="Size of the served map in KiB")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the injected errors")
+    parser.add_argument("--report-interval", type=float, default=60.0, help="Seconds between request reports, 0 disables")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
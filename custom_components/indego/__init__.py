@@ -11,7 +11,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers import aiohttp_client
+from homeassistant.helpers.importlib import async_import_module
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
@@ -25,9 +25,15 @@ from .const import (
     UPDATE_INTERVAL,
     CONF_MOWER_SERIAL,
     DEFAULT_NAME,
+    MOW_PREFETCH_LEAD,
 )
+from .cadence import next_mow_start
 from .coordinator import IndegoDataUpdateCoordinator
+from .http_session import async_get_api_session
+from .map_store import MapStore
 from .models import State, Calendar, OperatingData
+from .payload_store import PayloadStore
+from .rate_limiter import account_id_from_token, async_get_rate_limiter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,15 +47,16 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Indego from a config entry."""
     try:
-        # Get OAuth session
-        session = aiohttp_client.async_get_clientsession(hass)
-        
+        # All mowers share one connection pool to the API
+        session = async_get_api_session(hass)
+
         # Initialize API client
         api = IndegoApiClient(
             hass=hass,
             token=entry.data["token"]["access_token"],
             token_refresh_method=entry.data.get("token_refresh_method"),
             serial=entry.data[CONF_MOWER_SERIAL],
+            session=session,
         )
 
         # Initialize coordinator
@@ -57,10 +64,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             hass=hass,
             api=api,
             update_interval=UPDATE_INTERVAL,
+            store=PayloadStore(hass, entry.data[CONF_MOWER_SERIAL]),
         )
 
-        # Fetch initial data
-        await coordinator.async_config_entry_first_refresh()
+        # Set up from the last stored payloads and refresh them in the
+        # background, only wait for the cloud without them.
+        if await coordinator.async_restore():
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+            )
+        else:
+            await coordinator.async_config_entry_first_refresh()
+        coordinator.async_start_state_stream()
 
         hass.data[DOMAIN][entry.entry_id] = {
             "api": api,
@@ -81,15 +96,24 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, INDEGO_PLATFORMS):
         data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data["coordinator"].async_stop_state_stream()
         api: IndegoApiClient = data["api"]
         await api.shutdown()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored payloads of a removed config entry."""
+    await PayloadStore(hass, entry.data[CONF_MOWER_SERIAL]).async_remove()
+
+
 class IndegoEntity(CoordinatorEntity):
     """Base class for Indego entities."""
 
+    # The freshness changes with every update, keep it out of the recorder
+    _unrecorded_attributes = frozenset({"data_fetched", "data_restored"})
+
     def __init__(
         self,
         name: str,
@@ -128,11 +152,18 @@ class IndegoEntity(CoordinatorEntity):
             token_refresh_method=self._oauth_session.async_ensure_token_valid,
             serial=serial,
             api_url="https://api.indego.iot.bosch-si.com/api/v1/",
-            session=async_get_clientsession(self.hass),
+            session=async_get_api_session(self.hass),
         )
 
-        # Initialize the API manager with the async client
-        self.api = IndegoApiManager(self.hass, self._async_client)
+        # Initialize the API manager with the async client, mowers on the same
+        # Bosch account share one request budget.
+        self.api = IndegoApiManager(
+            self.hass,
+            self._async_client,
+            async_get_rate_limiter(
+                self.hass, account_id_from_token(oauth_session.token["access_token"])
+            ),
+        )
 
         # Initialize state holders
         self.states = {}
@@ -146,6 +177,7 @@ class IndegoEntity(CoordinatorEntity):
         self.map_image = None
         self.map_update_timestamp = None
         self.map_filename = None
+        self.map_store = MapStore(hass, serial)
         self.device_info = None
         self._battery_percent = None
         self._battery_percent_adjusted = None
@@ -162,11 +194,20 @@ class IndegoEntity(CoordinatorEntity):
         """Update state using the API manager."""
         try:
             state = await self.api.get_state(force=force_update, longpoll=True)
+            # Only touch the entities when the state payload actually changed,
+            # an empty set of changed fields means it changed as a whole.
+            changed = self._async_client.pop_changed_fields("state")
             if state:
-                self._mower_state = state.state
-                self._mower_state_description = state.state_description
-                self._mower_state_detail = state.state_description_detail
-                self._last_update = last_updated_now()
+                if changed is not None:
+                    if not changed or "state" in changed:
+                        self._mower_state = state.state
+                        self._mower_state_description = state.state_description
+                        self._mower_state_detail = state.state_description_detail
+                    self._last_update = last_updated_now()
+                    if (
+                        not changed or changed & {"map_update_available", "mapsvgcache_ts"}
+                    ) and self.map_store.needs_download(self._async_client.state):
+                        await self.download_and_save_map()
                 return True
         except Exception as exc:
             _LOGGER.error("Error updating state: %s", exc)
@@ -263,12 +304,18 @@ class IndegoEntity(CoordinatorEntity):
             )
 
     async def _adaptive_position_update(self):
-        """Update position adaptively based on state."""
+        """Update position adaptively based on state and the next planned mow."""
         if not self._shutdown:
             is_mowing = self._mower_state in [1, 2, 3]
-            interval = 1 if is_mowing else self._position_update_interval
-            
+            now = utcnow()
+            start = next_mow_start(None, self._next_mow, now)
+            mow_soon = start is not None and start - now <= MOW_PREFETCH_LEAD
+            interval = 1 if is_mowing or mow_soon else self._position_update_interval
+
             await self._async_update_state(True)
+            if mow_soon:
+                # Have the map on disk before the mower leaves the dock
+                await self.download_and_save_map()
             self._position_update_timer = async_track_point_in_time(
                 self.hass,
                 self._adaptive_position_update,
@@ -451,7 +498,7 @@ class IndegoEntity(CoordinatorEntity):
 
         target = targets[0]
         try:
-            await target.download_and_save_map()
+            await target.download_and_save_map(force=True)
         except Exception as exc:
             _LOGGER.error(
                 "Map download failed for %s: %s",
@@ -515,30 +562,39 @@ class IndegoEntity(CoordinatorEntity):
 
         return unload_ok
 
-    async def download_and_save_map(self, filename: str = None) -> bool:
-        """Download the map from the mower and save it."""
+    def map_path(self) -> str:
+        """Return the path of the current map of the mower."""
+        return self.map_store.path
+
+    async def download_and_save_map(self, force: bool = False) -> bool:
+        """Download the map from the mower when its version changed and save it."""
         try:
-            if filename is None:
-                filename = f"map_{self.serial}_{int(time.time())}.svg"
-                
-            # Use the API manager to download the map
-            success = await self.api.download_map(filename)
-            
-            if success:
-                self.map_filename = filename
-                self.map_update_timestamp = utcnow()
-                try:
-                    # Read and parse the SVG
-                    async with aiofiles.open(filename, mode='r') as f:
-                        content = await f.read()
-                        svg = fromstring(content)
-                        self.map_image = svg
-                        return True
-                except Exception as exc:
-                    _LOGGER.error("Failed to parse downloaded map: %s", exc)
-                    return False
-            else:
-                _LOGGER.error("Failed to download map")
+            stored = await self.map_store.async_update(
+                self._async_client.state,
+                # MapStore writes to a temporary file and moves it in place itself
+                lambda temp_path: self.api.download_map(temp_path, atomic=False),
+                force,
+            )
+            if not stored:
+                _LOGGER.debug("Map of %s is up to date or could not be downloaded", self.serial)
+                return False
+
+            filename = self.map_store.path
+            self.map_filename = filename
+            self.map_update_timestamp = utcnow()
+            # The map stack is only needed once a map was downloaded, import it off the event loop
+            aiofiles = await async_import_module(self.hass, "aiofiles")
+            element_tree = await async_import_module(self.hass, "xml.etree.ElementTree")
+
+            try:
+                # Read and parse the SVG
+                async with aiofiles.open(filename, mode='r') as f:
+                    content = await f.read()
+                    svg = element_tree.fromstring(content)
+                    self.map_image = svg
+                    return True
+            except Exception as exc:
+                _LOGGER.error("Failed to parse downloaded map: %s", exc)
                 return False
 
         except Exception as exc:
@@ -566,3 +622,8 @@ class IndegoEntity(CoordinatorEntity):
     def operating_data(self) -> OperatingData:
         """Return coordinator operating data."""
         return self.coordinator.operating_data
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the freshness of the coordinator data."""
+        return self.coordinator.data_freshness
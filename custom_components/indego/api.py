@@ -3,16 +3,17 @@ import logging
 import time
 from typing import Any, cast
 
+from aiohttp import ClientResponseError, ClientTimeout
 from homeassistant.components.application_credentials import AuthImplementation
 from homeassistant.helpers.config_entry_oauth2_flow import OAuth2Session
-from httpx import AsyncClient, HTTPStatusError, TimeoutException
 
-from .const import API_BASE_URL, API_RETRY_COUNT, API_BACKOFF_FACTOR
+from .const import API_BASE_URL, API_DEFAULT_TIMEOUT, API_RETRY_COUNT, API_BACKOFF_FACTOR
 from .exceptions import (
     IndegoAuthenticationError,
     IndegoConnectionError,
     IndegoRequestError,
 )
+from .http_session import async_get_api_session
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,7 +24,7 @@ class IndegoApiClient:
     def __init__(self, session: OAuth2Session):
         """Initialize the API client."""
         self._session = session
-        self._client = AsyncClient(base_url=API_BASE_URL)
+        self._client = async_get_api_session(session.hass)
 
     async def _request(
         self, method: str, endpoint: str, **kwargs: Any
@@ -35,27 +36,29 @@ class IndegoApiClient:
             "Authorization": f"Bearer {self._session.token['access_token']}",
             "Accept": "application/json",
         }
+        # The shared session has no timeout of its own
+        kwargs.setdefault("timeout", ClientTimeout(total=API_DEFAULT_TIMEOUT))
 
         for attempt in range(API_RETRY_COUNT):
             try:
-                response = await self._client.request(
+                async with self._client.request(
                     method,
-                    endpoint,
+                    f"{API_BASE_URL}/{endpoint}",
                     headers=headers,
                     **kwargs,
-                )
-                response.raise_for_status()
-                return response.json()
-            except TimeoutException as err:
+                ) as response:
+                    response.raise_for_status()
+                    return await response.json()
+            except asyncio.TimeoutError as err:
                 _LOGGER.debug("Request timed out: %s", err)
                 if attempt == API_RETRY_COUNT - 1:
                     raise IndegoConnectionError("Request timed out") from err
-            except HTTPStatusError as err:
+            except ClientResponseError as err:
                 _LOGGER.debug("HTTP error: %s", err)
-                if err.response.status_code == 401:
+                if err.status == 401:
                     raise IndegoAuthenticationError("Authentication failed") from err
-                if err.response.status_code in (400, 404):
-                    raise IndegoRequestError(f"Invalid request: {err.response.text}") from err
+                if err.status in (400, 404):
+                    raise IndegoRequestError(f"Invalid request: {err.message}") from err
                 if attempt == API_RETRY_COUNT - 1:
                     raise IndegoConnectionError(f"HTTP error: {err}") from err
             except Exception as err:
@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, TypeVar, Generic, Callable, Awaitable
 
@@ -11,13 +13,21 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.exceptions import ConfigEntryAuthFailed
 
-from ..const import DOMAIN, UPDATE_INTERVAL
+from ..const import (
+    API_DEFAULT_TIMEOUT,
+    DEFAULT_LONGPOLL_TIMEOUT,
+    DOMAIN,
+    UPDATE_INTERVAL,
+)
 from ..exceptions import (
     IndegoAuthenticationError,
     IndegoConnectionError,
     IndegoRequestError,
     IndegoRateLimitError
 )
+from ..http_session import async_get_api_session
+from ..pyindego.metrics import MetricsRegistry
+from ..rate_limiter import TokenBucket, account_id_from_token, async_get_rate_limiter
 
 _LOGGER = logging.getLogger(__name__)
 T = TypeVar("T")
@@ -32,6 +42,8 @@ class IndegoApiClient:
         token_refresh_method: Optional[Callable[[], Awaitable[str]]] = None,
         serial: Optional[str] = None,
         api_url: str = "https://api.indego.iot.bosch-si.com/api/v1/",
+        rate_limiter: Optional[TokenBucket] = None,
+        session: Optional[aiohttp.ClientSession] = None,
     ) -> None:
         """Initialize the API client."""
         self.hass = hass
@@ -39,9 +51,10 @@ class IndegoApiClient:
         self._token_refresh_method = token_refresh_method
         self._serial = serial
         self._api_url = api_url
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._rate_limit_remaining = 150  # Requests per minute
-        self._rate_limit_reset = datetime.now()
+        self._session: Optional[aiohttp.ClientSession] = session
+        self._rate_limiter = rate_limiter or async_get_rate_limiter(
+            hass, account_id_from_token(token)
+        )
         self._cache: Dict[str, Any] = {}
         self._cache_ttl: Dict[str, timedelta] = {
             "state": timedelta(seconds=5),
@@ -50,29 +63,16 @@ class IndegoApiClient:
             "calendar": timedelta(minutes=5),
         }
         self._last_request_time: Dict[str, datetime] = {}
+        self.metrics = MetricsRegistry(serial)
 
     async def initialize(self) -> None:
         """Initialize the client session."""
         if not self._session:
-            self._session = aiohttp.ClientSession()
+            self._session = async_get_api_session(self.hass)
 
     async def shutdown(self) -> None:
-        """Close the client session."""
-        if self._session:
-            await self._session.close()
-            self._session = None
-
-    def _check_rate_limit(self) -> None:
-        """Check if we can make a request based on rate limits."""
-        now = datetime.now()
-        if now >= self._rate_limit_reset:
-            self._rate_limit_remaining = 150
-            self._rate_limit_reset = now + timedelta(minutes=1)
-        
-        if self._rate_limit_remaining <= 0:
-            raise IndegoRateLimitError("Rate limit exceeded")
-        
-        self._rate_limit_remaining -= 1
+        """Release the client session, the shared pool is closed with Home Assistant."""
+        self._session = None
 
     async def _handle_request(
         self,
@@ -83,6 +83,7 @@ class IndegoApiClient:
         headers: Optional[Dict] = None,
         cache_key: Optional[str] = None,
         force_update: bool = False,
+        timeout: int = API_DEFAULT_TIMEOUT,
     ) -> Any:
         """Make an API request with error handling and caching."""
         if not self._session:
@@ -96,18 +97,26 @@ class IndegoApiClient:
             
             if cached_data and cache_time:
                 if datetime.now() - cache_time < cache_ttl:
+                    self.metrics.endpoint(method, endpoint).cache_hits += 1
                     return cached_data
+        if cache_key:
+            self.metrics.endpoint(method, endpoint).cache_misses += 1
 
-        # Rate limiting check
-        self._check_rate_limit()
+        # Rate limiting, shared with the other mowers on this account
+        if not await self._rate_limiter.acquire(timeout=API_DEFAULT_TIMEOUT):
+            raise IndegoRateLimitError("Rate limit exceeded")
 
         # Prepare headers
         request_headers = {
             "Authorization": f"Bearer {self._token}",
             "Content-Type": "application/json",
-            **headers or {}
+            **(headers or {})
         }
 
+        # The metrics keep longpolls apart from the plain state requests
+        path = f"{endpoint}?longpoll=true" if params and params.get("longpoll") == "true" else endpoint
+        bytes_out = len(json.dumps(data)) if data is not None else 0
+        request_start_time = time.monotonic()
         try:
             # Make request
             url = f"{self._api_url.rstrip('/')}/{endpoint.lstrip('/')}"
@@ -117,22 +126,36 @@ class IndegoApiClient:
                 params=params,
                 json=data,
                 headers=request_headers,
-                timeout=30,
+                timeout=timeout,
             ) as response:
                 # Update rate limits from headers
-                if "X-RateLimit-Remaining" in response.headers:
-                    self._rate_limit_remaining = int(response.headers["X-RateLimit-Remaining"])
-                
+                self._rate_limiter.update_from_headers(response.headers)
+                if not response.ok:
+                    self.metrics.record_response(
+                        method, path, response.status, time.monotonic() - request_start_time, 0, bytes_out
+                    )
+
                 # Handle common errors
                 if response.status == 401:
                     if self._token_refresh_method:
                         self._token = await self._token_refresh_method()
                         return await self._handle_request(
-                            method, endpoint, params, data, headers, cache_key, force_update
+                            method, endpoint, params, data, headers, cache_key, force_update, timeout
                         )
                     raise IndegoAuthenticationError("Authentication failed")
-                
+                if response.status == 429:
+                    raise IndegoRateLimitError("Rate limit exceeded")
+
                 response.raise_for_status()
+                content = await response.read()
+                self.metrics.record_response(
+                    method,
+                    path,
+                    response.status,
+                    time.monotonic() - request_start_time,
+                    len(content),
+                    bytes_out,
+                )
                 result = await response.json()
 
                 # Update cache
@@ -143,12 +166,33 @@ class IndegoApiClient:
                 return result
 
         except asyncio.TimeoutError as err:
+            self.metrics.record_failure(method, path, time.monotonic() - request_start_time, timeout=True)
             raise IndegoConnectionError(f"Request timed out: {err}") from err
+        except aiohttp.ClientResponseError as err:
+            # Already counted with its status code
+            raise IndegoConnectionError(f"Connection error: {err}") from err
         except aiohttp.ClientError as err:
+            self.metrics.record_failure(method, path, time.monotonic() - request_start_time)
             raise IndegoConnectionError(f"Connection error: {err}") from err
 
-    async def get_state(self, force_update: bool = False) -> Dict:
-        """Get the current state of the mower."""
+    async def get_state(
+        self,
+        force_update: bool = False,
+        longpoll: bool = False,
+        longpoll_timeout: int = DEFAULT_LONGPOLL_TIMEOUT,
+    ) -> Dict:
+        """Get the current state of the mower.
+
+        With longpoll the API holds the request open until the state changes
+        or the longpoll timeout expires.
+        """
+        if longpoll:
+            return await self._handle_request(
+                "GET",
+                f"alms/{self._serial}/state",
+                params={"longpoll": "true", "timeout": longpoll_timeout},
+                timeout=longpoll_timeout + API_DEFAULT_TIMEOUT,
+            )
         return await self._handle_request(
             "GET",
             f"alms/{self._serial}/state",
@@ -187,3 +231,11 @@ class IndegoApiClient:
             f"alms/{self._serial}/calendar",
             cache_key="calendar"
         )
+
+    async def get_next_mow(self) -> Dict:
+        """Get the start of the next planned mow."""
+        return await self._handle_request(
+            "GET",
+            f"alms/{self._serial}/predictive/nextcutting",
+            cache_key="next_mow"
+        )
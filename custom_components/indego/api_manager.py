@@ -20,34 +20,109 @@ from .const import (
     DEFAULT_STATE_UPDATE_TIMEOUT,
     DEFAULT_LONGPOLL_TIMEOUT,
 )
+from .rate_limiter import TokenBucket, parse_retry_after
 from pyIndego import IndegoAsyncClient
 
 _LOGGER = logging.getLogger(__name__)
 
+
+class RequestCancelled(Exception):
+    """The task running a shared request was cancelled before it finished."""
+
+
+class RetryScheduler:
+    """Park failed requests on a timer until their retry is due."""
+
+    def __init__(self):
+        """Initialize the retry scheduler."""
+        self._parked: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 0
+        self.total_parked = 0
+        self.total_delay = 0.0
+
+    async def wait(self, request_key: str, delay: float, reason: str) -> None:
+        """Wait for the retry delay of a request without blocking other requests."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        handle = loop.call_later(
+            delay, lambda: future.done() or future.set_result(None)
+        )
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._parked[entry_id] = {
+            "request_key": request_key,
+            "reason": reason,
+            "parked_at": time.monotonic(),
+            "delay": delay,
+        }
+        self.total_parked += 1
+        self.total_delay += delay
+
+        try:
+            await future
+        finally:
+            handle.cancel()
+            self._parked.pop(entry_id, None)
+
+    @property
+    def pending(self) -> int:
+        """Return the number of requests waiting for a retry."""
+        return len(self._parked)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the retry backlog for diagnostics."""
+        now = time.monotonic()
+        waiting = [
+            {
+                "request_key": entry["request_key"],
+                "reason": entry["reason"],
+                "waited": round(now - entry["parked_at"], 1),
+                "remaining": round(max(entry["parked_at"] + entry["delay"] - now, 0), 1),
+            }
+            for entry in self._parked.values()
+        ]
+        return {
+            "pending": len(waiting),
+            "longest_wait": max((entry["waited"] for entry in waiting), default=0),
+            "waiting": waiting,
+            "total_parked": self.total_parked,
+            "total_delay": round(self.total_delay, 1),
+        }
+
+
 class IndegoApiManager:
     """Class to manage API calls with caching and rate limiting."""
 
-    def __init__(self, hass: HomeAssistant, api_client: IndegoAsyncClient):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: IndegoAsyncClient,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
         """Initialize the API manager."""
         self.hass = hass
         self.api_client = api_client
+        self.rate_limiter = rate_limiter or TokenBucket()
         self._cache: Dict[str, Any] = {}
         self._cache_times: Dict[str, datetime] = {}
-        self._request_timestamps: list = []
-        self._rate_limit = 150  # Maximum requests per minute
         self._cache_ttl = {
             'state': timedelta(seconds=5),
+            'state_longpoll': timedelta(seconds=5),
             'generic_data': timedelta(minutes=60),
             'alerts': timedelta(minutes=5),
             'operating_data': timedelta(minutes=5),
             'next_mow': timedelta(minutes=5),
             'last_completed_mow': timedelta(minutes=5),
             'predictive_calendar': timedelta(minutes=30),
+            # The client decides per endpoint what update_all refreshes
+            'update_all': timedelta(0),
         }
         self._last_error_time: Dict[str, float] = {}
         self._error_count: Dict[str, int] = {}
-        self._lock = asyncio.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
         self._retry_count: Dict[str, int] = {}
+        self.retry_scheduler = RetryScheduler()
         self._max_retries = 5 
         self._min_retry_delay = 1
         self._max_retry_delay = 60
@@ -55,70 +130,114 @@ class IndegoApiManager:
         self._request_timeout = 30
 
     async def _handle_request(self, request_key: str, request_func, *args, **kwargs) -> Any:
-        """Handle an API request with retries, rate limiting and caching."""
-        async with self._lock:
-            # Check cache first
-            if self.is_cache_valid(request_key):
-                return self._cache.get(request_key)
-
-            # Wait for rate limiting
+        """Handle an API request with single-flight coalescing and caching.
+
+        Concurrent callers for the same request key share one in-flight request,
+        while requests for different keys run in parallel. When the task running
+        the request is cancelled, the first waiting caller runs it again.
+        """
+        metrics = self.api_client.metrics.request(request_key)
+
+        # Check cache first
+        if self.is_cache_valid(request_key):
+            metrics.cache_hits += 1
+            return self._cache.get(request_key)
+
+        # Join an identical request that is already on its way
+        inflight = self._inflight.get(request_key)
+        if inflight is not None:
+            _LOGGER.debug("Joining in-flight request for %s", request_key)
+            metrics.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except RequestCancelled:
+                _LOGGER.debug("In-flight request for %s was cancelled, taking it over", request_key)
+                return await self._handle_request(request_key, request_func, *args, **kwargs)
+
+        metrics.cache_misses += 1
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved, so a failure without waiters is not logged twice.
+        future.add_done_callback(lambda fut: fut.cancelled() or fut.exception())
+        self._inflight[request_key] = future
+        try:
+            result = await self._execute_request(request_key, request_func, *args, **kwargs)
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                # Only the leader was cancelled, don't cancel the callers waiting for it
+                future.set_exception(RequestCancelled(request_key))
+            self._inflight.pop(request_key, None)
+
+    async def _execute_request(self, request_key: str, request_func, *args, **kwargs) -> Any:
+        """Execute an API request with retries and rate limiting."""
+        retry_count = 0
+        last_exception = None
+        metrics = self.api_client.metrics.request(request_key)
+
+        while retry_count <= self._max_retries:
+            if retry_count:
+                metrics.retries += 1
+
+            # Every attempt is a request, so every attempt needs a token
             await self.wait_for_rate_limit()
 
-            retry_count = 0
-            last_exception = None
-
-            while retry_count <= self._max_retries:
-                try:
-                    # Ensure token is valid before request
-                    await self.api_client.start()
-
-                    # Make the request
-                    result = await request_func(*args, **kwargs)
-
-                    # Update cache
-                    self._cache[request_key] = result
-                    self._cache_times[request_key] = datetime.now()
-                    self._retry_count[request_key] = 0
-                    self._error_count[request_key] = 0
-
-                    return result
-
-                except (ClientResponseError, ServerTimeoutError) as exc:
-                    last_exception = exc
-                    status = getattr(exc, 'status', 0)
-                    
-                    # Handle specific status codes
-                    if status == 403:  # Forbidden - token likely expired
-                        await self.api_client.start()  # Force token refresh
-                    elif status == 429:  # Too many requests
-                        retry_delay = float(exc.headers.get('Retry-After', self._min_retry_delay))
-                        await asyncio.sleep(retry_delay)
-                    elif status == 500:  # Server error
-                        retry_count += 1
-                        retry_delay = self._calculate_retry_delay(retry_count)
-                        await asyncio.sleep(retry_delay)
-                    else:
-                        retry_count += 1
-                        retry_delay = self._calculate_retry_delay(retry_count)
-                        await asyncio.sleep(retry_delay)
-
-                except Exception as exc:
-                    last_exception = exc
-                    retry_count += 1
-                    retry_delay = self._calculate_retry_delay(retry_count)
-                    _LOGGER.warning(
-                        "Request failed for %s: %s. Retrying in %.1f seconds (attempt %d/%d)",
-                        request_key, exc, retry_delay, retry_count, self._max_retries
-                    )
-                    await asyncio.sleep(retry_delay)
+            try:
+                # Ensure token is valid before request
+                await self.api_client.start()
 
-            # If we get here, all retries failed
-            self._error_count[request_key] = self._error_count.get(request_key, 0) + 1
-            _LOGGER.error(
-                "Request failed for %s after %d retries: %s",
-                request_key, self._max_retries, last_exception
-            )
-            raise last_exception
+                # Make the request
+                result = await request_func(*args, **kwargs)
+
+                # Update cache
+                self._cache[request_key] = result
+                self._cache_times[request_key] = datetime.now()
+                self._retry_count[request_key] = 0
+                self._error_count[request_key] = 0
+
+                return result
+
+            except (ClientResponseError, ServerTimeoutError) as exc:
+                last_exception = exc
+                status = getattr(exc, 'status', 0)
+
+                # Handle specific status codes
+                retry_count += 1
+                if status == 403:  # Forbidden - token likely expired
+                    await self.api_client.start()  # Force token refresh
+                elif status == 429:  # Too many requests
+                    self.rate_limiter.update_from_headers(exc.headers)
+                    retry_delay = parse_retry_after(
+                        (exc.headers or {}).get('Retry-After'), self._min_retry_delay
+                    )
+                    await self.retry_scheduler.wait(request_key, retry_delay, "rate_limited")
+                else:
+                    retry_delay = self._calculate_retry_delay(retry_count)
+                    await self.retry_scheduler.wait(request_key, retry_delay, f"status_{status}")
+
+            except Exception as exc:
+                last_exception = exc
+                retry_count += 1
+                retry_delay = self._calculate_retry_delay(retry_count)
+                _LOGGER.warning(
+                    "Request failed for %s: %s. Retrying in %.1f seconds (attempt %d/%d)",
+                    request_key, exc, retry_delay, retry_count, self._max_retries
+                )
+                await self.retry_scheduler.wait(request_key, retry_delay, type(exc).__name__)
+
+        # If we get here, all retries failed
+        self._error_count[request_key] = self._error_count.get(request_key, 0) + 1
+        metrics.failures += 1
+        _LOGGER.error(
+            "Request failed for %s after %d retries: %s",
+            request_key, self._max_retries, last_exception
+        )
+        raise last_exception
 
     def _calculate_retry_delay(self, retry_count: int) -> float:
         """Calculate exponential backoff delay with jitter."""
@@ -153,24 +272,13 @@ class IndegoApiManager:
         if not self.api_client or not hasattr(self.api_client, '_session'):
             raise RuntimeError("API client not properly initialized")
 
-    def _clean_old_timestamps(self):
-        """Remove timestamps older than 1 minute."""
-        current_time = time.time()
-        self._request_timestamps = [
-            t for t in self._request_timestamps 
-            if current_time - t <= 60
-        ]
-
     def can_make_request(self) -> bool:
         """Check if we can make a new request based on rate limits."""
-        self._clean_old_timestamps()
-        return len(self._request_timestamps) < self._rate_limit
+        return self.rate_limiter.available >= 1
 
     async def wait_for_rate_limit(self):
         """Wait until we can make another request."""
-        while not self.can_make_request():
-            await asyncio.sleep(1)
-        self._request_timestamps.append(time.time())
+        await self.rate_limiter.acquire()
 
     def is_cache_valid(self, cache_key: str) -> bool:
         """Check if cached data is still valid."""
@@ -182,8 +290,9 @@ class IndegoApiManager:
 
     async def get_state(self, force: bool = False, longpoll: bool = False) -> Any:
         """Get the state from the mower."""
+        # A longpoll can take minutes, don't let plain state requests queue up behind it.
         return await self._handle_request(
-            'state',
+            'state_longpoll' if longpoll else 'state',
             self.api_client.get_state,
             force=force,
             longpoll=longpoll
@@ -247,24 +356,30 @@ class IndegoApiManager:
             command
         )
 
-    async def download_map(self, filename: str = None) -> bool:
-        """Download the map from the mower."""
+    async def download_map(self, filename: str = None, atomic: bool = True) -> bool:
+        """Download the map from the mower.
+
+        Every download writes its own file, so it is neither cached nor
+        joined with another download.
+        """
         try:
-            return await self._handle_request(
+            return await self._execute_request(
                 'download_map',
                 self.api_client.download_map,
-                filename
+                filename,
+                atomic
             )
         except Exception as exc:
             _LOGGER.error("Failed to download map: %s", exc)
             return False
 
-    async def update_all(self) -> None:
-        """Update all states from the API."""
+    async def update_all(self, force: bool = False) -> None:
+        """Update the states that are due, all of them with force."""
         try:
             await self._handle_request(
                 'update_all',
-                self.api_client.update_all
+                self.api_client.update_all,
+                force=force
             )
         except Exception as exc:
             _LOGGER.error("Failed to update all states: %s", exc)
@@ -0,0 +1,93 @@
+"""Poll cadence of the coordinator, driven by the mower state."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .const import (
+    CADENCE_ATTENTION,
+    CADENCE_DOCKED,
+    CADENCE_IDLE,
+    CADENCE_PREPARE,
+    INDEGO_STATE_TO_CADENCE,
+    MOW_PREFETCH_LEAD,
+    QUIET_HOURS_END,
+    QUIET_HOURS_START,
+)
+from .models import Calendar, State
+from .pyindego.schedule import MINUTES_PER_DAY, ScheduleIndex
+
+
+def calendar_index(calendar: Optional[Calendar]) -> Optional[ScheduleIndex]:
+    """Return the index of the slots of the weekly calendar, None without slots.
+
+    Build it once per calendar payload and pass it to the helpers below.
+    """
+    if calendar is None or not any(day.slots for day in calendar.days):
+        return None
+    return ScheduleIndex(
+        [
+            (
+                day.day * MINUTES_PER_DAY + slot.start.hour * 60 + slot.start.minute,
+                day.day * MINUTES_PER_DAY + slot.end.hour * 60 + slot.end.minute,
+            )
+            for day in calendar.days
+            for slot in day.slots
+        ]
+    )
+
+
+def calendar_slot_active(index: Optional[ScheduleIndex], now: datetime) -> Optional[bool]:
+    """Return if now is inside a slot of the weekly calendar, None without slots."""
+    if index is None:
+        return None
+    return index.active(now)
+
+
+def next_slot_start(index: Optional[ScheduleIndex], now: datetime) -> Optional[datetime]:
+    """Return the start of the next slot of the weekly calendar after now."""
+    if index is None:
+        return None
+    return index.next_start(now)
+
+
+def next_mow_start(
+    index: Optional[ScheduleIndex], next_mow: Optional[datetime], now: datetime
+) -> Optional[datetime]:
+    """Return when the mower starts next, from predictive/nextcutting or the calendar."""
+    starts = [start for start in (next_mow, next_slot_start(index, now)) if start and start > now]
+    return min(starts, default=None)
+
+
+def in_quiet_hours(now: datetime) -> bool:
+    """Return if now is in the quiet hours."""
+    return now.hour >= QUIET_HOURS_START or now.hour < QUIET_HOURS_END
+
+
+def mower_cadence(
+    state: Optional[State],
+    index: Optional[ScheduleIndex],
+    now: datetime,
+    next_mow: Optional[datetime] = None,
+) -> str:
+    """Return the poll cadence for the state of the mower.
+
+    A mower that mows or returns to the dock is polled fast, a paused or
+    failing one often. A docked mower is polled fast from MOW_PREFETCH_LEAD
+    before its next mow, on the default interval inside its calendar slots,
+    and barely outside of them or, without a calendar, at night.
+    """
+    if state is None:
+        return CADENCE_DOCKED
+    cadence = INDEGO_STATE_TO_CADENCE.get(state.state, CADENCE_ATTENTION)
+    if cadence != CADENCE_DOCKED:
+        return cadence
+    start = next_mow_start(index, next_mow, now)
+    if start is not None and start - now <= MOW_PREFETCH_LEAD:
+        return CADENCE_PREPARE
+    slot_active = calendar_slot_active(index, now)
+    if slot_active:
+        return CADENCE_DOCKED
+    if slot_active is False or in_quiet_hours(now):
+        return CADENCE_IDLE
+    return CADENCE_DOCKED
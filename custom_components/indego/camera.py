@@ -1,8 +1,6 @@
 import logging
 import time
 import asyncio
-import aiofiles
-import os
 
 from homeassistant.components.camera import (
     Camera,
@@ -13,7 +11,13 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_MAP_OUTPUT_FORMAT,
+    DEFAULT_MAP_OUTPUT_FORMAT,
+    MAP_OUTPUT_PNG,
+)
+from .map_renderer import EncodedMapImage, RasterMapRenderer, SvgMapRenderer
 from .mixins import IndegoEntity
 
 _LOGGER = logging.getLogger(__name__)
@@ -38,11 +42,23 @@ class IndegoCamera(IndegoEntity, Camera):
         Camera.__init__(self)
         self._indego_hub = indego_hub
         self._last_update_time = 0
-        self._svg_map = None
+        self._image = EncodedMapImage()
         self._attr_is_streaming = False
         self.content_type = "image/svg+xml"
-        self._positions: list[tuple[int, int]] = []
-        self._path_svg = ""
+        self._renderer = SvgMapRenderer(
+            indego_hub.progress_line_color, indego_hub.progress_line_width
+        )
+        self._rendered_position = None
+        self._raster = None
+        output_format = indego_hub.options.get(CONF_MAP_OUTPUT_FORMAT, DEFAULT_MAP_OUTPUT_FORMAT)
+        if output_format == MAP_OUTPUT_PNG:
+            if RasterMapRenderer.available():
+                self._raster = RasterMapRenderer(
+                    indego_hub.progress_line_color, indego_hub.progress_line_width
+                )
+                self.content_type = "image/png"
+            else:
+                _LOGGER.warning("Camera: PNG output needs cairosvg and Pillow, serving SVG")
         self._last_reset = time.time()
 
     async def async_added_to_hass(self) -> None:
@@ -52,94 +68,120 @@ class IndegoCamera(IndegoEntity, Camera):
         await self.refresh_map("unknown")
 
     async def async_camera_image(self, width: int | None = None, height: int | None = None) -> bytes | None:
-        if self._svg_map is None:
+        if not self._image.is_set:
             svg_path = self._indego_hub.map_path()
             _LOGGER.debug("Camera: loading map from file %s (fallback)", svg_path)
-            if not os.path.exists(svg_path):
-                _LOGGER.warning("Camera: SVG-File not available - no picture")
-                return None
             try:
-                async with aiofiles.open(svg_path, "r") as f:
-                    self._svg_map = await f.read()
+                if not await self._renderer.async_load_base_map(self.hass, svg_path):
+                    _LOGGER.warning("Camera: SVG-File not available - no picture")
+                    return None
             except Exception as e:
                 _LOGGER.error("Camera: Error during reading of SVG-File: %s", e)
                 return None
+            self._image.set(self._render())
+
+        if self._raster is not None:
+            return await self._async_raster_image(width, height)
+        return self._image.body
 
-        return self._svg_map.encode("utf-8")
+    async def _async_raster_image(self, width: int | None, height: int | None) -> bytes | None:
+        try:
+            return await self.hass.async_add_executor_job(
+                self._raster.render,
+                self._image.version,
+                self._renderer.map_version,
+                self._renderer.base_map,
+                self._raster_positions(),
+                self._rendered_position,
+                width,
+                height,
+            )
+        except (ImportError, OSError) as e:
+            _LOGGER.warning("Camera: PNG output not available (%s), serving SVG", e)
+            self._raster = None
+            self.content_type = "image/svg+xml"
+        except Exception as e:
+            _LOGGER.error("Camera: Error during rasterisation of the map: %s", e)
+            return None
+        return self._image.body
+
+    @property
+    def entity_picture(self) -> str:
+        # The content hash lets browsers and the camera proxy cache the image per version.
+        picture = super().entity_picture
+        content_hash = self._image.content_hash
+        if content_hash is None:
+            return picture
+        return f"{picture}&v={content_hash}"
 
     def update_streaming_state(self, is_streaming: bool) -> None:
         if not is_streaming and self._attr_is_streaming:
             _LOGGER.debug("Streaming updated to %s, forcing reload of map", is_streaming)
-            self._svg_map = None
+            self._image.clear()
         if self._attr_is_streaming != bool(is_streaming):
             self._attr_is_streaming = bool(is_streaming)
             self.async_write_ha_state()
 
+    def _mower_position(self) -> tuple[int, int] | None:
+        state = self._indego_hub._indego_client.state
+        xpos = getattr(state, "svg_xPos", None)
+        ypos = getattr(state, "svg_yPos", None)
+        if xpos is None or ypos is None:
+            return None
+        return xpos, ypos
+
+    def _raster_positions(self) -> list[tuple[int, int]]:
+        return list(self._renderer.positions)
+
+    def _render(self) -> str:
+        self._rendered_position = self._mower_position()
+        return self._renderer.render(self._rendered_position)
+
+    async def _async_load_base_map(self) -> bool:
+        svg_path = self._indego_hub.map_path()
+        if not await self._renderer.async_load_base_map(self.hass, svg_path):
+            _LOGGER.warning("Camera: SVG-File %s not present – no update", svg_path)
+            return False
+        return True
+
     async def refresh_map(self, mower_state: str):
         try:
-            svg_path = self._indego_hub.map_path()
-            if not os.path.exists(svg_path):
-                _LOGGER.warning("Camera: SVG-File %s not present – no update", svg_path)
+            if not await self._async_load_base_map():
                 return
 
-            async with aiofiles.open(svg_path, "r") as f:
-                svg_text = await f.read()
-
-            svg_text = svg_text.replace('#FAFAFA', 'transparent').replace('#CCCCCC', 'transparent')
-
             now = time.time()
             progress = getattr(self._indego_hub._indego_client.state, "mowed", None)
             if progress == 100 or now - self._last_reset >= 86400:
                 _LOGGER.debug("Resetting map overlay")
-                self._positions = []
-                self._path_svg = ""
+                self._renderer.reset_trail()
                 self._last_reset = now
 
-            xpos = getattr(self._indego_hub._indego_client.state, "svg_xPos", None)
-            ypos = getattr(self._indego_hub._indego_client.state, "svg_yPos", None)
-
-            if xpos is not None and ypos is not None:
-                if self._positions:
-                    last_x, last_y = self._positions[-1]
-                    self._path_svg += (
-                        f'<line x1="{last_x}" y1="{last_y}" x2="{xpos}" y2="{ypos}" '
-                        f'stroke="{self._indego_hub.progress_line_color}" stroke-width="{self._indego_hub.progress_line_width}" stroke-linecap="round" />'
-                    )
-                self._positions.append((xpos, ypos))
-
-                icon_path = "M1 14V5H13C18.5 5 23 9.5 23 15V17H20.83C20.42 18.17 19.31 19 18 19C16.69 19 15.58 18.17 15.17 17H10C9.09 18.21 7.64 19 6 19C3.24 19 1 16.76 1 14M6 11C4.34 11 3 12.34 3 14C3 15.66 4.34 17 6 17C7.66 17 9 15.66 9 14C9 12.34 7.66 11 6 11M15 10V12H20.25C19.92 11.27 19.5 10.6 19 10H15Z"
-                symbol = (
-                    f'<path d="{icon_path}" fill="#009688" stroke="#009688" '
-                    f'stroke-width="1.5" transform="translate({xpos - 24} {ypos - 24}) scale(3.0)" />'
-                )
-
-                svg_text = svg_text.replace('<path id="mower"', '<!-- removed mower -->')
-                svg_text = svg_text.replace("</svg>", self._path_svg + symbol + "</svg>")
-            else:
-                svg_text = svg_text.replace("</svg>", self._path_svg + "</svg>")
+            position = self._mower_position()
+            if position is not None:
+                self._renderer.add_position(*position)
 
-            self._svg_map = svg_text
-            self.async_write_ha_state()
+            self._rendered_position = position
+            if self._image.set(self._renderer.render(position)):
+                self.async_write_ha_state()
 
         except Exception as e:
             _LOGGER.error("Camera: Error during map update: %s", e)
 
 
 class IndegoMapCamera(IndegoCamera):
+    def _raster_positions(self) -> list[tuple[int, int]]:
+        return []
+
+    def _render(self) -> str:
+        return self._renderer.render(with_trail=False)
+
     async def refresh_map(self, mower_state: str):
         try:
-            svg_path = self._indego_hub.map_path()
-            if not os.path.exists(svg_path):
-                _LOGGER.warning("Camera: SVG-File %s not present – no update", svg_path)
+            if not await self._async_load_base_map():
                 return
 
-            async with aiofiles.open(svg_path, "r") as f:
-                svg_text = await f.read()
-
-            svg_text = svg_text.replace('#FAFAFA', 'transparent').replace('#CCCCCC', 'transparent')
-
-            self._svg_map = svg_text
-            self.async_write_ha_state()
+            if self._image.set(self._render()):
+                self.async_write_ha_state()
 
         except Exception as e:
             _LOGGER.error("Camera: Error during map update: %s", e)
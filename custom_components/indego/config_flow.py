@@ -12,14 +12,13 @@ from homeassistant.const import CONF_NAME
 from homeassistant.data_entry_flow import FlowResult, SOURCE_REAUTH
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import config_entry_oauth2_flow, selector
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.core import callback
 from homeassistant.components.application_credentials import (
     ClientCredential,
     async_import_client_credential,
 )
 
-from .pyindego.indego_async_client import IndegoAsyncClient
+from .http_session import async_get_api_session
 
 from .const import (
     DOMAIN,
@@ -35,12 +34,15 @@ from .const import (
     CONF_PROGRESS_LINE_COLOR,
     CONF_STATE_UPDATE_TIMEOUT,
     CONF_LONGPOLL_TIMEOUT,
+    CONF_MAP_OUTPUT_FORMAT,
     DEFAULT_POSITION_UPDATE_INTERVAL,
     DEFAULT_ADAPTIVE_POSITION_UPDATES,
     DEFAULT_STATE_UPDATE_TIMEOUT,
     DEFAULT_LONGPOLL_TIMEOUT,
+    DEFAULT_MAP_OUTPUT_FORMAT,
     MAP_PROGRESS_LINE_WIDTH,
     MAP_PROGRESS_LINE_COLOR,
+    MAP_OUTPUT_FORMATS,
     HTTP_HEADER_USER_AGENT,
     HTTP_HEADER_USER_AGENT_DEFAULT,
     HTTP_HEADER_USER_AGENT_DEFAULTS,
@@ -124,6 +126,10 @@ class IndegoOptionsFlowHandler(config_entries.OptionsFlowWithConfigEntry):
                     CONF_LONGPOLL_TIMEOUT,
                     default=self.options.get(CONF_LONGPOLL_TIMEOUT, DEFAULT_LONGPOLL_TIMEOUT),
                 ): int,
+                vol.Optional(
+                    CONF_MAP_OUTPUT_FORMAT,
+                    default=self.options.get(CONF_MAP_OUTPUT_FORMAT, DEFAULT_MAP_OUTPUT_FORMAT),
+                ): vol.In(MAP_OUTPUT_FORMATS),
             }
         )
         return self.async_show_form(step_id="init", data_schema=schema)
@@ -223,7 +229,9 @@ class IndegoFlowHandler(config_entry_oauth2_flow.AbstractOAuth2FlowHandler, doma
             await self.hass.config_entries.async_reload(self.reauth_entry.entry_id)
             return self.async_abort(reason="reauth_successful")
 
-        session = async_get_clientsession(self.hass)
+        from .pyindego.indego_async_client import IndegoAsyncClient  # pylint: disable=import-outside-toplevel
+
+        session = async_get_api_session(self.hass)
         client = None
         try:
             client = IndegoAsyncClient(
@@ -264,10 +272,11 @@ class IndegoFlowHandler(config_entry_oauth2_flow.AbstractOAuth2FlowHandler, doma
         """Handle config flow advanced settings step ."""
         if user_input is not None:
             _LOGGER.debug("Testing API access by retrieving available mowers...")
+            from .pyindego.indego_async_client import IndegoAsyncClient  # pylint: disable=import-outside-toplevel
 
             api_client = IndegoAsyncClient(
                 token=self._data["token"]["access_token"],
-                session=async_get_clientsession(self.hass),
+                session=async_get_api_session(self.hass),
                 raise_request_exceptions=True
             )
             if not default_user_agent_in_config(user_input):
@@ -17,11 +17,116 @@ API_RATE_LIMIT_WINDOW: Final = timedelta(minutes=1)
 API_RETRY_COUNT: Final = 3
 API_BACKOFF_FACTOR: Final = 1.5
 
+# Connection pool shared by all API clients, every mower holds a longpoll open
+# and idle connections have to outlive the poll interval to be reused.
+HTTP_POOL_LIMIT: Final = 1024
+HTTP_POOL_LIMIT_PER_HOST: Final = 512
+HTTP_POOL_KEEPALIVE_TIMEOUT: Final = 330
+HTTP_POOL_DNS_CACHE_TTL: Final = 300
+
 # Update intervals
 UPDATE_INTERVAL: Final = timedelta(minutes=5)
 POSITION_UPDATE_INTERVAL: Final = timedelta(seconds=60)
 STATE_UPDATE_INTERVAL: Final = timedelta(seconds=30)
 CALENDAR_UPDATE_INTERVAL: Final = timedelta(minutes=15)
+STATE_STREAM_MIN_INTERVAL: Final = timedelta(seconds=1)
+
+# Poll cadence of the coordinator by what the mower is doing
+CADENCE_ACTIVE: Final = "active"
+CADENCE_ATTENTION: Final = "attention"
+CADENCE_DOCKED: Final = "docked"
+CADENCE_IDLE: Final = "idle"
+CADENCE_PREPARE: Final = "prepare"
+CADENCE_POLL_INTERVALS: Final = {
+    CADENCE_ACTIVE: timedelta(seconds=30),
+    CADENCE_PREPARE: timedelta(minutes=1),
+    CADENCE_ATTENTION: timedelta(minutes=2),
+    CADENCE_DOCKED: UPDATE_INTERVAL,
+    CADENCE_IDLE: timedelta(minutes=30),
+}
+CADENCE_DATA_INTERVALS: Final = {
+    "calendar": {
+        CADENCE_ACTIVE: CALENDAR_UPDATE_INTERVAL,
+        CADENCE_ATTENTION: CALENDAR_UPDATE_INTERVAL,
+        CADENCE_DOCKED: CALENDAR_UPDATE_INTERVAL,
+        CADENCE_IDLE: timedelta(hours=1),
+        CADENCE_PREPARE: CALENDAR_UPDATE_INTERVAL,
+    },
+    "operating_data": {
+        CADENCE_ACTIVE: timedelta(minutes=2),
+        CADENCE_PREPARE: UPDATE_INTERVAL,
+        CADENCE_ATTENTION: UPDATE_INTERVAL,
+        CADENCE_DOCKED: UPDATE_INTERVAL,
+        CADENCE_IDLE: timedelta(hours=1),
+    },
+    "alerts": {
+        CADENCE_ACTIVE: UPDATE_INTERVAL,
+        CADENCE_ATTENTION: timedelta(minutes=1),
+        CADENCE_DOCKED: UPDATE_INTERVAL,
+        CADENCE_IDLE: timedelta(hours=1),
+        CADENCE_PREPARE: UPDATE_INTERVAL,
+    },
+    # The next mow only moves with the calendar or after a mow, see
+    # IndegoDataUpdateCoordinator._async_update_cadence.
+    "next_mow": {
+        CADENCE_ACTIVE: timedelta(hours=1),
+        CADENCE_ATTENTION: timedelta(hours=1),
+        CADENCE_DOCKED: timedelta(hours=1),
+        CADENCE_IDLE: timedelta(hours=1),
+        CADENCE_PREPARE: timedelta(minutes=5),
+    },
+}
+# Poll cadence by Indego state code, following the activities in vacuum.py: mowing
+# and returning are active, docked is docked, everything else needs attention.
+INDEGO_STATE_TO_CADENCE: Final = {
+    0: CADENCE_DOCKED,
+    101: CADENCE_DOCKED,
+    257: CADENCE_DOCKED,
+    258: CADENCE_DOCKED,
+    259: CADENCE_DOCKED,
+    260: CADENCE_DOCKED,
+    261: CADENCE_DOCKED,
+    262: CADENCE_DOCKED,
+    263: CADENCE_DOCKED,
+    266: CADENCE_ACTIVE,
+    512: CADENCE_ACTIVE,
+    513: CADENCE_ACTIVE,
+    514: CADENCE_ACTIVE,
+    515: CADENCE_ACTIVE,
+    516: CADENCE_ACTIVE,
+    517: CADENCE_ATTENTION,
+    518: CADENCE_ACTIVE,
+    519: CADENCE_ATTENTION,
+    520: CADENCE_ACTIVE,
+    521: CADENCE_ACTIVE,
+    522: CADENCE_ACTIVE,
+    523: CADENCE_ACTIVE,
+    524: CADENCE_ACTIVE,
+    525: CADENCE_ACTIVE,
+    768: CADENCE_ACTIVE,
+    769: CADENCE_ACTIVE,
+    770: CADENCE_ACTIVE,
+    771: CADENCE_ACTIVE,
+    772: CADENCE_ACTIVE,
+    773: CADENCE_ACTIVE,
+    774: CADENCE_ACTIVE,
+    775: CADENCE_ACTIVE,
+    776: CADENCE_ACTIVE,
+    1005: CADENCE_ACTIVE,
+    1025: CADENCE_ATTENTION,
+    1026: CADENCE_ATTENTION,
+    1027: CADENCE_ATTENTION,
+    1038: CADENCE_ATTENTION,
+    1281: CADENCE_DOCKED,
+    1537: CADENCE_ATTENTION,
+    64513: CADENCE_DOCKED,
+    99999: CADENCE_ATTENTION,
+}
+# Lead time before a planned mow in which polling ramps up and the caches are warmed
+MOW_PREFETCH_LEAD: Final = timedelta(minutes=5)
+# Local hours in which a docked mower is only polled on the idle cadence
+QUIET_HOURS_START: Final = 22
+QUIET_HOURS_END: Final = 6
 
 # Cache TTLs
 CACHE_TTL_STATE: Final = timedelta(seconds=5)
@@ -49,6 +154,7 @@ CONF_POSITION_UPDATE_INTERVAL: Final = "position_update_interval"
 CONF_ADAPTIVE_POSITION_UPDATES: Final = "adaptive_position_updates"
 CONF_STATE_UPDATE_TIMEOUT: Final = "state_update_timeout"
 CONF_LONGPOLL_TIMEOUT: Final = "longpoll_timeout"
+CONF_MAP_OUTPUT_FORMAT: Final = "map_output_format"
 
 # Default values
 DEFAULT_NAME: Final = "Indego"
@@ -56,6 +162,7 @@ DEFAULT_POSITION_UPDATE_INTERVAL: Final = 10
 DEFAULT_ADAPTIVE_POSITION_UPDATES: Final = True
 DEFAULT_STATE_UPDATE_TIMEOUT: Final = 10
 DEFAULT_LONGPOLL_TIMEOUT: Final = 60
+DEFAULT_MAP_OUTPUT_FORMAT: Final = "svg"
 DEFAULT_NAME_COMMANDS: Final = None
 
 # Services
@@ -111,6 +218,7 @@ ENTITY_BATTERY_CYCLES: Final = "battery_cycles"
 ENTITY_AVERAGE_MOW_TIME: Final = "average_mow_time"
 ENTITY_WEEKLY_AREA: Final = "weekly_area"
 ENTITY_API_ERRORS: Final = "api_errors"
+ENTITY_API_REQUESTS: Final = "api_requests"
 
 # HTTP Headers
 HTTP_HEADER_USER_AGENT: Final = "User-Agent"
@@ -128,9 +236,21 @@ API_ERROR_LOG_INTERVAL: Final = 300
 MAP_PROGRESS_LINE_WIDTH: Final = 6
 MAP_PROGRESS_LINE_COLOR: Final = "#0000FF"
 MAP_UPDATE_INTERVAL: Final = timedelta(minutes=10)
+MAP_OUTPUT_SVG: Final = "svg"
+MAP_OUTPUT_PNG: Final = "png"
+MAP_OUTPUT_FORMATS: Final = [MAP_OUTPUT_SVG, MAP_OUTPUT_PNG]
+MAP_RASTER_CACHE_SIZE: Final = 4
+MAP_STORE_DIRECTORY: Final = "indego_maps"
+MAP_STORE_DISK_BUDGET: Final = 20 * 1024 * 1024
+
+# Last good API payloads, restored on startup
+PAYLOAD_STORE_VERSION: Final = 1
+PAYLOAD_STORE_SAVE_DELAY: Final = 30
 
 # Event constants
 DATA_UPDATED: Final = f"{DOMAIN}_data_updated"
+DATA_RATE_LIMITERS: Final = f"{DOMAIN}_rate_limiters"
+DATA_HTTP_SESSION: Final = f"{DOMAIN}_http_session"
 SERVER_DATA_ALERT_INDEX: Final = "alert_index"
 
 # Mower states
@@ -2,83 +2,115 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Any, Callable, Optional
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
 
 from .api import IndegoApiClient
+from .cadence import calendar_index, mower_cadence, next_mow_start
 from .const import (
     DOMAIN,
     UPDATE_INTERVAL,
     STATE_UPDATE_INTERVAL,
-    CALENDAR_UPDATE_INTERVAL,
+    DEFAULT_LONGPOLL_TIMEOUT,
+    STATE_STREAM_MIN_INTERVAL,
+    STATUS_UPDATE_FAILURE_DELAY_TIME,
+    CADENCE_ACTIVE,
+    CADENCE_DATA_INTERVALS,
+    CADENCE_DOCKED,
+    CADENCE_IDLE,
+    CADENCE_POLL_INTERVALS,
+    MOW_PREFETCH_LEAD,
 )
 from .exceptions import (
     IndegoAuthenticationError,
     IndegoConnectionError,
+    IndegoError,
     IndegoRequestError,
 )
+from .helpers import convert_bosch_datetime
 from .models import State, Calendar, OperatingData, Alert
+from .payload_store import PayloadStore
+from .pyindego.schedule import ScheduleIndex
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class IndegoDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching Indego data."""
+    """Class to manage fetching Indego data.
+
+    The poll interval follows the cadence of the mower state, see
+    cadence.py. Calendar, operating data, alerts and the next mow each keep
+    the time of their last fetch and are only fetched again when their
+    interval for the current cadence passed. MOW_PREFETCH_LEAD before the
+    next mow the state and the secondary data are fetched, so they are
+    warm when the mower leaves the dock.
+
+    Every good payload is kept in the PayloadStore. On startup the
+    coordinator is set up from the stored payloads, the data classes stay
+    marked as restored until they were fetched from the cloud again.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
         api: IndegoApiClient,
         update_interval: timedelta = UPDATE_INTERVAL,
+        store: Optional[PayloadStore] = None,
     ) -> None:
         """Initialize global Indego data updater."""
         self.api = api
+        self.store = store
         self.state: Optional[State] = None
         self.calendar: Optional[Calendar] = None
+        # The cadence looks up the calendar slots on every update, index them once per payload
+        self.calendar_index: Optional[ScheduleIndex] = None
         self.operating_data: Optional[OperatingData] = None
         self.alerts: list[Alert] = []
+        self.next_mow: Optional[datetime] = None
+        self._stream_task: Optional[asyncio.Task] = None
+        self._stream_failures = 0
+        self._secondary_task: Optional[asyncio.Task] = None
+        self.cadence = CADENCE_DOCKED
+        self._last_fetch: dict[str, float] = {}
+        self.fetched: dict[str, datetime] = {}
+        self.restored: set[str] = set()
+        self._prewarm_at: Optional[datetime] = None
+        self._prewarm_unsub: Optional[Callable[[], None]] = None
+        # Last applied payload and the keys changed since the last push, per data class
+        self._payloads: dict[str, Any] = {}
+        self._changed: dict[str, set[str]] = {}
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
             update_interval=update_interval,
+            # Polls that changed nothing don't notify the listeners
+            always_update=False,
         )
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from Indego API."""
         try:
-            # Get state with shorter interval
-            state_data = await self.api.get_state(force_update=True)
-            self.state = State.from_dict(state_data)
-
-            tasks = []
-
-            # Only update other data less frequently
-            if not self.calendar or self.calendar_needs_update():
-                tasks.append(self._update_calendar())
-            if not self.operating_data or self.operating_data_needs_update():
-                tasks.append(self._update_operating_data())
-            if not self.alerts or self.alerts_need_update():
-                tasks.append(self._update_alerts())
-
-            if tasks:
-                await asyncio.gather(*tasks)
+            # The state stream delivers the state, only poll it without one
+            if not self.streaming or self.state is None or "state" in self.restored:
+                state_data = await self.api.get_state(force_update=True)
+                self._async_fetched("state", state_data)
 
-            return {
-                "state": self.state,
-                "calendar": self.calendar,
-                "operating_data": self.operating_data,
-                "alerts": self.alerts,
-            }
+            self._async_update_cadence()
+            await self._async_update_secondary_data()
+            return self._data_snapshot()
 
         except IndegoAuthenticationError as err:
             _LOGGER.error("Authentication failed: %s", err)
@@ -93,11 +125,274 @@ class IndegoDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.exception("Unexpected error communicating with Indego API")
             raise UpdateFailed(f"Unexpected error: {err}") from err
 
+    async def _async_update_secondary_data(self) -> bool:
+        """Update calendar, operating data and alerts when they are due.
+
+        The poll, the state stream and the warm-up share one fetch when they
+        run at the same time. Returns True when any data was fetched.
+        """
+        if self._secondary_task is None or self._secondary_task.done():
+            self._secondary_task = self.hass.async_create_task(
+                self._async_fetch_secondary_data()
+            )
+        return await asyncio.shield(self._secondary_task)
+
+    async def _async_fetch_secondary_data(self) -> bool:
+        """Fetch the due data classes, returns True when any was fetched."""
+        tasks = []
+
+        # Only update other data less frequently
+        if self.calendar_needs_update():
+            tasks.append(self._update_calendar())
+        if self.operating_data_needs_update():
+            tasks.append(self._update_operating_data())
+        if self.alerts_need_update():
+            tasks.append(self._update_alerts())
+        if self.next_mow_needs_update():
+            tasks.append(self._update_next_mow())
+
+        if not tasks:
+            return False
+        await asyncio.gather(*tasks)
+        self._async_update_cadence()
+        return True
+
+    async def async_restore(self) -> bool:
+        """Set the coordinator up from the stored payloads, returns False without a stored state."""
+        if self.store is None:
+            return False
+        for data_class, (payload, fetched) in (await self.store.async_load()).items():
+            try:
+                self._apply_payload(data_class, payload)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.warning("Ignoring the stored %s payload, it could not be parsed", data_class)
+                continue
+            self._payloads[data_class] = payload
+            # The listeners get the restored data with the first push
+            self._changed[data_class] = set()
+            self.restored.add(data_class)
+            if fetched is not None:
+                self.fetched[data_class] = fetched
+
+        if self.state is None:
+            return False
+        _LOGGER.debug("Restored %s from the payload store", ", ".join(sorted(self.restored)))
+        self._async_update_cadence()
+        self.async_set_updated_data(self._data_snapshot())
+        return True
+
+    def _apply_payload(self, data_class: str, payload: Any) -> None:
+        """Parse a stored or fetched payload into its data class."""
+        if data_class == "state":
+            self.state = State.from_dict(payload)
+        elif data_class == "calendar":
+            self.calendar = Calendar.from_dict(payload)
+            self.calendar_index = calendar_index(self.calendar)
+        elif data_class == "operating_data":
+            self.operating_data = OperatingData.from_dict(payload)
+        elif data_class == "alerts":
+            self.alerts = [Alert.from_dict(alert) for alert in payload]
+        elif data_class == "next_mow":
+            mow_next = (payload or {}).get("mow_next")
+            self.next_mow = convert_bosch_datetime(mow_next) if mow_next else None
+
+    @callback
+    def _async_fetched(self, data_class: str, payload: Any) -> bool:
+        """Apply a good payload fetched from the cloud, returns True when it changed.
+
+        An unchanged payload keeps the objects built from the previous one.
+        The changed keys are collected for the next push to the listeners,
+        an empty set means the payload changed as a whole.
+        """
+        previous = self._payloads.get(data_class)
+        changed = not (payload is previous or payload == previous)
+        if changed:
+            self._apply_payload(data_class, payload)
+            self._payloads[data_class] = payload
+            keys = self._changed.setdefault(data_class, set())
+            if isinstance(payload, dict) and isinstance(previous, dict):
+                keys.update(
+                    key for key in payload.keys() | previous.keys() if payload.get(key) != previous.get(key)
+                )
+
+        self._last_fetch[data_class] = self.hass.loop.time()
+        self.fetched[data_class] = dt_util.utcnow()
+        self.restored.discard(data_class)
+        if self.store is not None:
+            self.store.async_set(data_class, payload, self.fetched[data_class])
+        return changed
+
+    @property
+    def data_freshness(self) -> dict[str, Any]:
+        """Return when the data was fetched and what is still served from the store."""
+        return {
+            "data_fetched": {
+                data_class: fetched.isoformat() for data_class, fetched in self.fetched.items()
+            },
+            "data_restored": sorted(self.restored),
+        }
+
+    def _data_snapshot(self) -> dict[str, Any]:
+        """Return the current data for the coordinator listeners.
+
+        changed holds the keys changed per data class since the last push.
+        """
+        changed, self._changed = self._changed, {}
+        return {
+            "changed": changed,
+            "state": self.state,
+            "calendar": self.calendar,
+            "operating_data": self.operating_data,
+            "alerts": self.alerts,
+        }
+
+    @property
+    def streaming(self) -> bool:
+        """Return True when the state stream is delivering updates."""
+        return (
+            self._stream_task is not None
+            and not self._stream_task.done()
+            and self._stream_failures == 0
+        )
+
+    @callback
+    def async_start_state_stream(self) -> None:
+        """Start the longpoll state stream for this mower."""
+        if self._stream_task is None or self._stream_task.done():
+            self._stream_failures = 0
+            self._stream_task = self.hass.async_create_background_task(
+                self._async_state_stream(), f"{DOMAIN} state stream"
+            )
+
+    async def async_stop_state_stream(self) -> None:
+        """Stop the longpoll state stream."""
+        if self._prewarm_unsub is not None:
+            self._prewarm_unsub()
+            self._prewarm_unsub = None
+        for task in (self._stream_task, self._secondary_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._stream_task = None
+        self._secondary_task = None
+
+    async def _async_state_stream(self) -> None:
+        """Keep a longpoll state request open and push every answer to the listeners.
+
+        The next longpoll is armed as soon as a response arrives. While the
+        stream fails the coordinator polls the state on STATE_UPDATE_INTERVAL.
+        """
+        loop = self.hass.loop
+        while True:
+            started = loop.time()
+            try:
+                state_data = await self.api.get_state(
+                    longpoll=True, longpoll_timeout=DEFAULT_LONGPOLL_TIMEOUT
+                )
+            except IndegoAuthenticationError as err:
+                _LOGGER.error("State stream stopped, authentication failed: %s", err)
+                self._stream_failed()
+                return
+            except Exception as err:  # pylint: disable=broad-except
+                self._stream_failed()
+                if not isinstance(err, IndegoError):
+                    _LOGGER.exception("Unexpected error in state stream")
+                delay = STATUS_UPDATE_FAILURE_DELAY_TIME[
+                    min(self._stream_failures, len(STATUS_UPDATE_FAILURE_DELAY_TIME) - 1)
+                ]
+                _LOGGER.debug("State stream failed (%s), retrying in %i seconds", err, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            if self._stream_failures:
+                _LOGGER.info("State stream restored, stop polling the state")
+                self._stream_failures = 0
+                self._async_update_cadence()
+
+            # A longpoll that timed out answers with the unchanged state
+            if state_data and self._async_fetched("state", state_data):
+                self._async_update_cadence()
+                self.async_set_updated_data(self._data_snapshot())
+                # Re-arm the longpoll right away, the due data follows on its own
+                self.hass.async_create_background_task(
+                    self._async_stream_secondary_data(), f"{DOMAIN} stream secondary data"
+                )
+
+            # Guard against an API answering the longpoll without holding it open
+            elapsed = loop.time() - started
+            if elapsed < STATE_STREAM_MIN_INTERVAL.total_seconds():
+                await asyncio.sleep(STATE_STREAM_MIN_INTERVAL.total_seconds() - elapsed)
+
+    async def _async_stream_secondary_data(self) -> None:
+        """Fetch the due data next to the state stream and push it once it arrived."""
+        if await self._async_update_secondary_data() and self._changed:
+            self.async_set_updated_data(self._data_snapshot())
+
+    @callback
+    def _stream_failed(self) -> None:
+        """Fall back to polling the state while the stream is down."""
+        self._stream_failures += 1
+        if self._stream_failures == 1:
+            _LOGGER.warning("State stream failed, falling back to polling")
+            self._async_update_cadence()
+
+    @callback
+    def _async_update_cadence(self) -> None:
+        """Set the poll interval for the current state of the mower."""
+        now = dt_util.now()
+        cadence = mower_cadence(self.state, self.calendar_index, now, self.next_mow)
+        if cadence != self.cadence:
+            _LOGGER.debug("Poll cadence changed from %s to %s", self.cadence, cadence)
+            if self.cadence == CADENCE_ACTIVE:
+                # The mower is done, the next mow moved
+                self._last_fetch.pop("next_mow", None)
+            self.cadence = cadence
+
+        interval = CADENCE_POLL_INTERVALS[cadence]
+        # Without the stream the state is polled, keep it current unless the mower sleeps.
+        if not self.streaming and cadence != CADENCE_IDLE:
+            interval = min(interval, STATE_UPDATE_INTERVAL)
+        self.update_interval = interval
+        self._async_schedule_prewarm(now)
+
+    @callback
+    def _async_schedule_prewarm(self, now: datetime) -> None:
+        """Wake up MOW_PREFETCH_LEAD before the next mow, whatever the poll interval."""
+        start = next_mow_start(self.calendar_index, self.next_mow, now)
+        prewarm_at = start - MOW_PREFETCH_LEAD if start is not None else None
+        if prewarm_at == self._prewarm_at:
+            return
+        if self._prewarm_unsub is not None:
+            self._prewarm_unsub()
+            self._prewarm_unsub = None
+        self._prewarm_at = prewarm_at
+        if prewarm_at is not None and prewarm_at > now:
+            _LOGGER.debug("Next mow at %s, warming up at %s", start, prewarm_at)
+            self._prewarm_unsub = async_track_point_in_time(
+                self.hass, self._async_prewarm, prewarm_at
+            )
+
+    async def _async_prewarm(self, _now: datetime) -> None:
+        """Fetch the state and the due data right before the mower starts."""
+        self._prewarm_unsub = None
+        self._prewarm_at = None
+        try:
+            state_data = await self.api.get_state(force_update=True)
+        except IndegoError as err:
+            _LOGGER.debug("Could not warm up the state before the next mow: %s", err)
+            return
+        self._async_fetched("state", state_data)
+        self._async_update_cadence()
+        await self._async_update_secondary_data()
+        if self._changed:
+            self.async_set_updated_data(self._data_snapshot())
+
     async def _update_calendar(self) -> None:
         """Update calendar data."""
         try:
             calendar_data = await self.api.get_calendar()
-            self.calendar = Calendar.from_dict(calendar_data)
+            self._async_fetched("calendar", calendar_data)
             _LOGGER.debug("Successfully updated calendar")
         except IndegoRequestError as err:
             _LOGGER.warning("Could not update calendar: %s", err)
@@ -108,7 +403,7 @@ class IndegoDataUpdateCoordinator(DataUpdateCoordinator):
         """Update operating data."""
         try:
             operating_data = await self.api.get_generic_data()
-            self.operating_data = OperatingData.from_dict(operating_data)
+            self._async_fetched("operating_data", operating_data)
             _LOGGER.debug("Successfully updated operating data")
         except IndegoRequestError as err:
             _LOGGER.warning("Could not update operating data: %s", err)
@@ -119,27 +414,44 @@ class IndegoDataUpdateCoordinator(DataUpdateCoordinator):
         """Update alerts."""
         try:
             alerts_data = await self.api.get_alerts()
-            self.alerts = [Alert.from_dict(alert) for alert in alerts_data]
+            self._async_fetched("alerts", alerts_data)
             _LOGGER.debug("Successfully updated alerts")
         except IndegoRequestError as err:
             _LOGGER.warning("Could not update alerts: %s", err)
         except Exception:
             _LOGGER.exception("Unexpected error updating alerts")
 
+    async def _update_next_mow(self) -> None:
+        """Update the start of the next mow."""
+        try:
+            next_mow_data = await self.api.get_next_mow()
+            self._async_fetched("next_mow", next_mow_data)
+            _LOGGER.debug("Successfully updated next mow")
+        except IndegoRequestError as err:
+            _LOGGER.warning("Could not update next mow: %s", err)
+        except Exception:
+            _LOGGER.exception("Unexpected error updating next mow")
+
     def calendar_needs_update(self) -> bool:
         """Check if calendar needs update."""
-        return self._needs_update(CALENDAR_UPDATE_INTERVAL)
+        return self._needs_update("calendar")
 
     def operating_data_needs_update(self) -> bool:
         """Check if operating data needs update."""
-        return self._needs_update(UPDATE_INTERVAL)
+        return self._needs_update("operating_data")
 
     def alerts_need_update(self) -> bool:
         """Check if alerts need update."""
-        return self._needs_update(UPDATE_INTERVAL)
+        return self._needs_update("alerts")
+
+    def next_mow_needs_update(self) -> bool:
+        """Check if the next mow needs update."""
+        return self._needs_update("next_mow")
 
-    def _needs_update(self, interval: timedelta) -> bool:
-        """Check if data needs update based on interval."""
-        if not self.last_update_success:
+    def _needs_update(self, data_class: str) -> bool:
+        """Check if a data class was not fetched within its interval for the current cadence."""
+        last_fetch = self._last_fetch.get(data_class)
+        if last_fetch is None:
             return True
-        return self.last_update_success + interval < self.hass.loop.time()
+        interval: timedelta = CADENCE_DATA_INTERVALS[data_class][self.cadence]
+        return self.hass.loop.time() - last_fetch >= interval.total_seconds()
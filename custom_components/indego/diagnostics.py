@@ -1,6 +1,7 @@
 """Diagnostics support for Indego integration."""
 from __future__ import annotations
 
+from dataclasses import asdict, is_dataclass
 from datetime import datetime
 from typing import Any, Dict
 
@@ -8,6 +9,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN
+from .pyindego.helpers import unknown_field_counts
 
 
 def _serialize_dt(value: Any) -> Any:
@@ -22,31 +24,45 @@ async def async_get_config_entry_diagnostics(
 ) -> Dict[str, Any]:
     """Return diagnostics for a config entry."""
     hub = hass.data[DOMAIN][entry.entry_id]
-    client = hub.client
+    if isinstance(hub, dict):
+        # Set up with the coordinator, its API client makes the requests
+        client = hub["api"]
+        state = hub["coordinator"].state
+    else:
+        client = hub.client
+        state = getattr(client, "state", None)
 
-    state = getattr(client, "state", None)
     state_data = None
     if state is not None:
-        state_data = getattr(state, "__dict__", str(state))
-
-    request_attrs = [
-        "last_state_request",
-        "last_generic_data_request",
-        "last_operating_data_request",
-        "last_alerts_request",
-        "last_predictive_calendar_request",
-    ]
-    last_requests = {
-        attr: _serialize_dt(getattr(client, attr, None)) for attr in request_attrs
-    }
+        state_data = asdict(state) if is_dataclass(state) else str(state)
+
+    metrics = getattr(client, "metrics", None)
+    last_requests = {}
+    if metrics is not None:
+        last_requests = {
+            name: _serialize_dt(
+                datetime.fromtimestamp(endpoint.last_request) if endpoint.last_request else None
+            )
+            for name, endpoint in metrics.endpoints.items()
+        }
 
     error_counts = {
         "update_failures": getattr(hub, "_update_fail_count", None),
-        "request_errors": getattr(client, "error_counter", None),
+        "request_errors": metrics.total_errors if metrics is not None else None,
     }
 
+    api = getattr(hub, "api", None)
+    retry_scheduler = getattr(api, "retry_scheduler", None)
+    rate_limiter = getattr(api, "rate_limiter", None)
+    scheduler = getattr(client, "scheduler", None)
+
     return {
         "state": state_data,
         "last_request_times": last_requests,
         "error_counts": error_counts,
+        "retry_backlog": retry_scheduler.as_dict() if retry_scheduler else None,
+        "rate_limiter": rate_limiter.as_dict() if rate_limiter else None,
+        "unknown_api_fields": unknown_field_counts(),
+        "api_metrics": metrics.as_dict() if metrics is not None else None,
+        "refresh_schedule": scheduler.as_dict() if scheduler is not None else None,
     }
@@ -6,7 +6,7 @@ import logging
 import math
 from typing import Any, Dict, Optional
 
-import pytz
+from homeassistant.util import dt as dt_util
 
 from .const import (
     STATE_ERROR,
@@ -31,12 +31,12 @@ def convert_bosch_datetime(dt_str: str) -> Optional[datetime]:
 
 def get_local_datetime(dt: datetime, timezone_str: str) -> datetime:
     """Convert UTC datetime to local timezone."""
-    try:
-        local_tz = pytz.timezone(timezone_str)
-        return dt.astimezone(local_tz)
-    except Exception as err:
-        _LOGGER.error("Error converting timezone for %s to %s: %s", dt, timezone_str, err)
+    # get_time_zone caches the zoneinfo objects
+    local_tz = dt_util.get_time_zone(timezone_str) if timezone_str else None
+    if local_tz is None:
+        _LOGGER.error("Error converting timezone for %s to unknown timezone %s", dt, timezone_str)
         return dt
+    return dt.astimezone(local_tz)
 
 
 def calculate_mow_progress(total_size: float, mowed_size: float) -> int:
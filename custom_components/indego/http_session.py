@@ -0,0 +1,49 @@
+"""HTTP connection pool shared by the Bosch Indego API clients."""
+from __future__ import annotations
+
+import logging
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util import ssl as ssl_util
+
+from .const import (
+    DATA_HTTP_SESSION,
+    HTTP_POOL_DNS_CACHE_TTL,
+    HTTP_POOL_KEEPALIVE_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_api_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the session shared by all API clients and config entries.
+
+    All requests go to the same host, so one keep-alive pool saves a TLS
+    handshake per client. The Home Assistant session is not used, its limit
+    of 100 connections per host is used up by the longpolls of 100 mowers.
+    """
+    session: aiohttp.ClientSession | None = hass.data.get(DATA_HTTP_SESSION)
+    if session is not None and not session.closed:
+        return session
+
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_POOL_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_POOL_DNS_CACHE_TTL,
+        enable_cleanup_closed=True,
+        ssl=ssl_util.get_default_context(),
+    )
+    session = hass.data[DATA_HTTP_SESSION] = aiohttp.ClientSession(connector=connector)
+
+    async def _async_close_session(event: Event) -> None:
+        _LOGGER.debug("Closing the API connection pool")
+        await session.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    return session
@@ -0,0 +1,375 @@
+"""Incremental SVG map renderer for the Indego cameras."""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Optional
+
+from .const import MAP_PROGRESS_LINE_COLOR, MAP_PROGRESS_LINE_WIDTH, MAP_RASTER_CACHE_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+MOWER_ICON_PATH = "M1 14V5H13C18.5 5 23 9.5 23 15V17H20.83C20.42 18.17 19.31 19 18 19C16.69 19 15.58 18.17 15.17 17H10C9.09 18.21 7.64 19 6 19C3.24 19 1 16.76 1 14M6 11C4.34 11 3 12.34 3 14C3 15.66 4.34 17 6 17C7.66 17 9 15.66 9 14C9 12.34 7.66 11 6 11M15 10V12H20.25C19.92 11.27 19.5 10.6 19 10H15Z"
+
+_MOWER_ELEMENT = re.compile(r'<path id="mower"[^>]*?(?:/>|>.*?</path>)', re.DOTALL)
+_SVG_END = "</svg>"
+_SVG_ROOT = re.compile(r"<svg\b[^>]*>")
+_VIEW_BOX = re.compile(r'viewBox="\s*([-\d.]+)[\s,]+([-\d.]+)[\s,]+([\d.]+)[\s,]+([\d.]+)\s*"')
+_WIDTH = re.compile(r'\swidth="([\d.]+)(?:px)?"')
+_HEIGHT = re.compile(r'\sheight="([\d.]+)(?:px)?"')
+
+
+def _read_changed_file(path: str, version) -> Optional[tuple]:
+    """Return the version of the file and its text, the text is None when unchanged.
+
+    Returns None when the file is not available. Runs in the executor.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    current = (path, stat.st_mtime_ns, stat.st_size)
+    if current == version:
+        return current, None
+    with open(path, "r", encoding="utf-8") as svg_file:
+        return current, svg_file.read()
+
+class SvgMapRenderer:
+    """Render the mowing trail and the mower icon on top of a cached base map.
+
+    The base map is read and prepared once per map file version. The trail is
+    kept as one growing polyline point buffer, so an update only serialises
+    the small overlay and joins it with the cached parts of the base map.
+    """
+
+    def __init__(
+        self,
+        line_color: str = MAP_PROGRESS_LINE_COLOR,
+        line_width: int = MAP_PROGRESS_LINE_WIDTH,
+    ):
+        """Initialize the renderer."""
+        self._line_color = line_color
+        self._line_width = line_width
+        self._map_version: Optional[tuple] = None
+        self._head = ""
+        self._tail = ""
+        self._mower_element = ""
+        self._points: list[str] = []
+        self._positions: list[tuple[int, int]] = []
+        self._last_position: Optional[tuple[int, int]] = None
+
+    @property
+    def has_map(self) -> bool:
+        """Return True when a base map is loaded."""
+        return self._map_version is not None
+
+    @property
+    def map_version(self):
+        """Return the version of the loaded base map."""
+        return self._map_version
+
+    @property
+    def trail_length(self) -> int:
+        """Return the number of positions in the trail."""
+        return len(self._points)
+
+    @property
+    def positions(self) -> list[tuple[int, int]]:
+        """Return the positions of the trail."""
+        return self._positions
+
+    def base_map(self, with_mower: bool = True) -> str:
+        """Return the base map without overlay."""
+        if with_mower:
+            return self._head + self._mower_element + self._tail
+        return self._head + self._tail
+
+    def set_base_map(self, svg_text: str, version=None) -> None:
+        """Prepare the base map, it is split around the overlay insertion point."""
+        svg_text = svg_text.replace("#FAFAFA", "transparent").replace("#CCCCCC", "transparent")
+
+        match = _MOWER_ELEMENT.search(svg_text)
+        self._mower_element = match.group(0) if match else ""
+        if match:
+            svg_text = svg_text[: match.start()] + svg_text[match.end():]
+
+        end = svg_text.rfind(_SVG_END)
+        if end < 0:
+            end = len(svg_text)
+        self._head = svg_text[:end]
+        self._tail = svg_text[end:]
+        self._map_version = version if version is not None else len(svg_text)
+
+    async def async_load_base_map(self, hass, svg_path: str) -> bool:
+        """Load the base map from disk, only when the file changed since the last load.
+
+        Returns True when the base map is available.
+        """
+        loaded = await hass.async_add_executor_job(
+            _read_changed_file, svg_path, self._map_version
+        )
+        if loaded is None:
+            return self.has_map
+
+        version, svg_text = loaded
+        if svg_text is not None:
+            _LOGGER.debug("Loading base map from %s", svg_path)
+            self.set_base_map(svg_text, version)
+        return True
+
+    def add_position(self, xpos: int, ypos: int) -> None:
+        """Add a mower position to the trail, repeated positions are skipped."""
+        if self._last_position == (xpos, ypos):
+            return
+        self._last_position = (xpos, ypos)
+        self._points.append(f"{xpos},{ypos}")
+        self._positions.append((xpos, ypos))
+
+    def reset_trail(self) -> None:
+        """Clear the mowing trail."""
+        self._points = []
+        self._positions = []
+        self._last_position = None
+
+    def _trail_svg(self) -> str:
+        """Return the polyline element for the trail."""
+        if len(self._points) < 2:
+            return ""
+        return (
+            f'<polyline points="{" ".join(self._points)}" fill="none" '
+            f'stroke="{self._line_color}" stroke-width="{self._line_width}" '
+            'stroke-linecap="round" stroke-linejoin="round" />'
+        )
+
+    @staticmethod
+    def _mower_svg(xpos: int, ypos: int) -> str:
+        """Return the mower icon at the given position."""
+        return (
+            f'<path d="{MOWER_ICON_PATH}" fill="#009688" stroke="#009688" '
+            f'stroke-width="1.5" transform="translate({xpos - 24} {ypos - 24}) scale(3.0)" />'
+        )
+
+    def render(self, mower_position: Optional[tuple[int, int]] = None, with_trail: bool = True) -> str:
+        """Return the map with the overlay.
+
+        The mower icon of the base map is replaced when a position is given.
+        """
+        trail = self._trail_svg() if with_trail else ""
+        if mower_position is None:
+            return self._head + self._mower_element + trail + self._tail
+        return self._head + trail + self._mower_svg(*mower_position) + self._tail
+
+
+class EncodedMapImage:
+    """Version stamped, pre-encoded camera image.
+
+    The bytes and the content hash are built lazily, once per new image, so
+    repeated fetches of an unchanged image do not encode the document again.
+    """
+
+    def __init__(self):
+        """Initialize the image buffer."""
+        self._text: Optional[str] = None
+        self._body: Optional[bytes] = None
+        self._content_hash: Optional[str] = None
+        self.version = 0
+
+    @property
+    def is_set(self) -> bool:
+        """Return True when an image is available."""
+        return self._text is not None
+
+    def set(self, text: str) -> bool:
+        """Replace the image, returns False when it did not change."""
+        if text == self._text:
+            return False
+        self._text = text
+        self._body = None
+        self._content_hash = None
+        self.version += 1
+        return True
+
+    def clear(self) -> None:
+        """Drop the image."""
+        self._text = None
+        self._body = None
+        self._content_hash = None
+
+    @property
+    def body(self) -> Optional[bytes]:
+        """Return the encoded image."""
+        if self._body is None and self._text is not None:
+            self._body = self._text.encode("utf-8")
+        return self._body
+
+    @property
+    def content_hash(self) -> Optional[str]:
+        """Return a short hash of the encoded image."""
+        if self._content_hash is None and self.body is not None:
+            self._content_hash = hashlib.blake2b(self._body, digest_size=8).hexdigest()
+        return self._content_hash
+
+
+def _view_box(svg_text: str) -> Optional[tuple[float, float, float, float]]:
+    """Return (min x, min y, width, height) of the SVG root element."""
+    root = _SVG_ROOT.search(svg_text)
+    if not root:
+        return None
+    match = _VIEW_BOX.search(root.group(0))
+    if match:
+        return tuple(float(value) for value in match.groups())
+    width = _WIDTH.search(root.group(0))
+    height = _HEIGHT.search(root.group(0))
+    if width and height:
+        return 0.0, 0.0, float(width.group(1)), float(height.group(1))
+    return None
+
+
+def _output_scale(view_width: float, view_height: float, width: Optional[int], height: Optional[int]) -> float:
+    """Return the scale that fits the map into the requested size, keeping the aspect ratio."""
+    if width and height:
+        return min(width / view_width, height / view_height)
+    if width:
+        return width / view_width
+    if height:
+        return height / view_height
+    return 1.0
+
+
+class RasterMapRenderer:
+    """Rasterise the map to PNG.
+
+    The base map is rasterised once per map version, mower icon variant and
+    output size. Per update only the trail and the mower icon are drawn on a
+    copy of the cached base image. Rendering is blocking and meant to run in
+    an executor.
+    """
+
+    def __init__(
+        self,
+        line_color: str = MAP_PROGRESS_LINE_COLOR,
+        line_width: int = MAP_PROGRESS_LINE_WIDTH,
+        cache_size: int = MAP_RASTER_CACHE_SIZE,
+    ):
+        """Initialize the renderer."""
+        self._line_color = line_color
+        self._line_width = line_width
+        self._cache_size = cache_size
+        self._bases: OrderedDict = OrderedDict()
+        self._frames: OrderedDict = OrderedDict()
+        self._icons: dict = {}
+
+    @staticmethod
+    def available() -> bool:
+        """Return True when the rasterisation dependencies are installed."""
+        return all(importlib.util.find_spec(name) for name in ("cairosvg", "PIL"))
+
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key, value, size: int) -> None:
+        """Add a value to a bounded LRU cache."""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+
+    def _base(self, map_version, base_map, with_mower: bool, width: Optional[int], height: Optional[int]):
+        """Return the rasterised base map with its view box and scale."""
+        key = (map_version, with_mower, width, height)
+        cached = self._bases.get(key)
+        if cached is not None:
+            self._bases.move_to_end(key)
+            return cached
+
+        import cairosvg  # pylint: disable=import-outside-toplevel
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+
+        svg_text = base_map(with_mower)
+        view_box = _view_box(svg_text)
+        if view_box is None:
+            png = cairosvg.svg2png(bytestring=svg_text.encode("utf-8"))
+            image = Image.open(io.BytesIO(png)).convert("RGBA")
+            view_box = (0.0, 0.0, float(image.width), float(image.height))
+            scale = 1.0
+        else:
+            scale = _output_scale(view_box[2], view_box[3], width, height)
+            png = cairosvg.svg2png(
+                bytestring=svg_text.encode("utf-8"),
+                output_width=max(round(view_box[2] * scale), 1),
+                output_height=max(round(view_box[3] * scale), 1),
+            )
+            image = Image.open(io.BytesIO(png)).convert("RGBA")
+
+        _LOGGER.debug("Rasterised base map %s at %dx%d", map_version, image.width, image.height)
+        cached = (image, view_box, scale)
+        self._cache_put(self._bases, key, cached, self._cache_size)
+        return cached
+
+    def _icon(self, scale: float):
+        """Return the mower icon rasterised for the given map scale."""
+        size = max(round(72 * scale), 1)
+        icon = self._icons.get(size)
+        if icon is None:
+            import cairosvg  # pylint: disable=import-outside-toplevel
+            from PIL import Image  # pylint: disable=import-outside-toplevel
+
+            svg_text = (
+                '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24">'
+                f'<path d="{MOWER_ICON_PATH}" fill="#009688" stroke="#009688" stroke-width="0.5" /></svg>'
+            )
+            png = cairosvg.svg2png(bytestring=svg_text.encode("utf-8"), output_width=size, output_height=size)
+            icon = self._icons[size] = Image.open(io.BytesIO(png)).convert("RGBA")
+        return icon
+
+    def render(
+        self,
+        frame_version,
+        map_version,
+        base_map,
+        positions: list[tuple[int, int]],
+        mower_position: Optional[tuple[int, int]] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> bytes:
+        """Return the PNG of the map with the trail and the mower icon.
+
+        Frames are cached by frame version and output size, base_map is
+        called to get the SVG text of the base map when it is not cached yet.
+        """
+        key = (frame_version, width, height)
+        frame = self._frames.get(key)
+        if frame is not None:
+            return frame
+
+        from PIL import ImageDraw  # pylint: disable=import-outside-toplevel
+
+        base, (min_x, min_y, _, _), scale = self._base(
+            map_version, base_map, mower_position is None, width, height
+        )
+        image = base.copy()
+
+        if len(positions) > 1:
+            ImageDraw.Draw(image).line(
+                [((xpos - min_x) * scale, (ypos - min_y) * scale) for xpos, ypos in positions],
+                fill=self._line_color,
+                width=max(round(self._line_width * scale), 1),
+                joint="curve",
+            )
+        if mower_position is not None:
+            icon = self._icon(scale)
+            xpos, ypos = mower_position
+            image.alpha_composite(
+                icon,
+                (round((xpos - 24 - min_x) * scale), round((ypos - 24 - min_y) * scale)),
+            )
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", compress_level=1)
+        frame = buffer.getvalue()
+        self._cache_put(self._frames, key, frame, self._cache_size)
+        return frame
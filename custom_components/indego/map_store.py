@@ -0,0 +1,155 @@
+"""Versioned on-disk store for the garden maps of the mowers."""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from typing import Any, Awaitable, Callable, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import MAP_STORE_DIRECTORY, MAP_STORE_DISK_BUDGET
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MapStore:
+    """Keep the map of one mower on disk, keyed by State.mapsvgcache_ts.
+
+    The current map always lives at the same path. A new version is only
+    downloaded when the mower reports a map update or a new map timestamp,
+    it is written to a temporary file and moved in place atomically. The
+    replaced versions are kept next to it as long as they fit in the disk
+    budget.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        serial: str,
+        directory: Optional[str] = None,
+        disk_budget: int = MAP_STORE_DISK_BUDGET,
+    ):
+        """Initialize the map store."""
+        self._hass = hass
+        self._serial = serial
+        self._directory = directory or hass.config.path(MAP_STORE_DIRECTORY)
+        self._disk_budget = disk_budget
+        self._version: Optional[int] = None
+        self._has_map: Optional[bool] = None
+        self._map_update_available: Optional[bool] = None
+
+    @property
+    def path(self) -> str:
+        """Return the path of the current map."""
+        return os.path.join(self._directory, f"map_{self._serial}.svg")
+
+    @property
+    def version(self) -> Optional[int]:
+        """Return the map timestamp of the stored map."""
+        return self._version
+
+    def _version_path(self) -> str:
+        return os.path.join(self._directory, f"map_{self._serial}.version")
+
+    def _archive_path(self, version: Any) -> str:
+        return os.path.join(self._directory, f"map_{self._serial}_{version}.svg")
+
+    def _load_version(self) -> tuple[bool, Optional[int]]:
+        """Return if a map is stored and its version."""
+        if not os.path.exists(self.path):
+            return False, None
+        try:
+            with open(self._version_path(), encoding="utf-8") as version_file:
+                return True, int(version_file.read().strip())
+        except (OSError, ValueError):
+            return True, None
+
+    def needs_download(self, state: Any) -> bool:
+        """Return True when the map of the given mower state is not stored yet."""
+        if not self._has_map:
+            return True
+        map_update_available = getattr(state, "map_update_available", None)
+        if map_update_available and not self._map_update_available:
+            return True
+        map_ts = getattr(state, "mapsvgcache_ts", None)
+        return map_ts is not None and map_ts != self._version
+
+    async def async_update(
+        self,
+        state: Any,
+        download: Callable[[str], Awaitable[Any]],
+        force: bool = False,
+    ) -> bool:
+        """Download the map when its version changed, returns True when a new map was stored.
+
+        download is called with the temporary file name to write the map to.
+        """
+        if self._has_map is None:
+            self._has_map, self._version = await self._hass.async_add_executor_job(self._load_version)
+
+        needs_download = force or self.needs_download(state)
+        self._map_update_available = getattr(state, "map_update_available", None)
+        if not needs_download:
+            return False
+
+        await self._hass.async_add_executor_job(os.makedirs, self._directory, 0o755, True)
+        temp_path = f"{self.path}.tmp"
+        if not await download(temp_path):
+            await self._hass.async_add_executor_job(self._remove, temp_path)
+            return False
+
+        version = getattr(state, "mapsvgcache_ts", None)
+        if not await self._hass.async_add_executor_job(self._commit, temp_path, version):
+            _LOGGER.warning("Map download of %s reported success without writing %s", self._serial, temp_path)
+            return False
+        _LOGGER.debug("Stored map version %s of %s at %s", version, self._serial, self.path)
+        self._has_map = True
+        self._version = version
+        return True
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _commit(self, temp_path: str, version: Optional[int]) -> bool:
+        """Move a downloaded map in place and archive the replaced one, False without a download."""
+        if not os.path.exists(temp_path):
+            return False
+        if self._version is not None and os.path.exists(self.path):
+            archive_path = self._archive_path(self._version)
+            try:
+                os.link(self.path, archive_path)
+            except FileExistsError:
+                pass
+            except OSError:
+                shutil.copy2(self.path, archive_path)
+
+        os.replace(temp_path, self.path)
+        version_temp_path = f"{self._version_path()}.tmp"
+        with open(version_temp_path, "w", encoding="utf-8") as version_file:
+            version_file.write("" if version is None else str(version))
+        os.replace(version_temp_path, self._version_path())
+        self._prune()
+        return True
+
+    def _prune(self) -> None:
+        """Remove the oldest archived maps until they fit in the disk budget."""
+        prefix = f"map_{self._serial}_"
+        archives = []
+        for entry in os.scandir(self._directory):
+            if entry.name.startswith(prefix) and entry.name.endswith(".svg"):
+                stat = entry.stat()
+                archives.append((stat.st_mtime, stat.st_size, entry.path))
+
+        archives.sort()
+        total = sum(size for _, size, _ in archives)
+        for _, size, path in archives:
+            if total <= self._disk_budget:
+                break
+            _LOGGER.debug("Removing archived map %s", path)
+            self._remove(path)
+            total -= size
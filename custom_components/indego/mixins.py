@@ -9,6 +9,9 @@ _LOGGER = logging.getLogger(__name__)
 class IndegoEntity(RestoreEntity):
     """Base class for Indego entities."""
 
+    # The freshness changes with every update, keep it out of the recorder
+    _unrecorded_attributes = frozenset({"data_fetched", "data_restored"})
+
     def __init__(self, entity_id, name, icon, attributes, device_info: DeviceInfo):
         self.entity_id = entity_id
         self._unique_id = entity_id
@@ -52,8 +55,11 @@ class IndegoEntity(RestoreEntity):
 
     @property
     def extra_state_attributes(self) -> dict:
-        """Return attributes."""
-        return self._attr
+        """Return attributes, with the freshness of the coordinator data."""
+        coordinator = getattr(getattr(self, "_indego_hub", None), "coordinator", None)
+        if coordinator is None:
+            return self._attr
+        return {**(self._attr or {}), **coordinator.data_freshness}
 
     def add_attributes(self, attr: dict, sync_state: bool = True):
         """Update attributes."""
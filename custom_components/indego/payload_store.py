@@ -0,0 +1,75 @@
+"""On-disk store for the last good API payloads of a mower."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, PAYLOAD_STORE_SAVE_DELAY, PAYLOAD_STORE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PayloadStore:
+    """Keep the last good payload of every endpoint of one mower.
+
+    The coordinator restores the payloads on startup, so the platforms set
+    up without waiting for the cloud. Writes are coalesced by the storage
+    helper, which also flushes them when Home Assistant stops. A change is
+    written at most PAYLOAD_STORE_SAVE_DELAY seconds after it was made, even
+    while new payloads keep arriving.
+    """
+
+    def __init__(self, hass: HomeAssistant, serial: str):
+        """Initialize the payload store."""
+        self._hass = hass
+        self._store: Store = Store(hass, PAYLOAD_STORE_VERSION, f"{DOMAIN}.{serial}.payloads")
+        self._payloads: dict[str, Any] = {}
+        self._fetched: dict[str, str] = {}
+        # Loop time of the first change that was not written yet
+        self._unsaved_since: Optional[float] = None
+
+    async def async_load(self) -> dict[str, tuple[Any, Optional[datetime]]]:
+        """Return the stored payloads with the time they were fetched."""
+        try:
+            stored = await self._store.async_load()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unable to load the stored payloads, starting without them")
+            stored = None
+        if not stored:
+            return {}
+
+        self._payloads = stored.get("payloads", {})
+        self._fetched = stored.get("fetched", {})
+        return {
+            data_class: (payload, dt_util.parse_datetime(self._fetched.get(data_class) or ""))
+            for data_class, payload in self._payloads.items()
+        }
+
+    @callback
+    def async_set(self, data_class: str, payload: Any, fetched: datetime) -> None:
+        """Remember a fresh payload and schedule a write."""
+        self._payloads[data_class] = payload
+        self._fetched[data_class] = fetched.isoformat()
+
+        # async_delay_save restarts its timer on every call, count the delay from
+        # the first unsaved change so a mowing mower can't put the write off forever.
+        now = self._hass.loop.time()
+        if self._unsaved_since is None:
+            self._unsaved_since = now
+        self._store.async_delay_save(
+            self._data_to_save, max(0, self._unsaved_since + PAYLOAD_STORE_SAVE_DELAY - now)
+        )
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._unsaved_since = None
+        return {"payloads": self._payloads, "fetched": self._fetched}
+
+    async def async_remove(self) -> None:
+        """Remove the stored payloads."""
+        await self._store.async_remove()
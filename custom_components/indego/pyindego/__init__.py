@@ -1,3 +1,16 @@
 """Init for Indego class."""
-from .indego_async_client import IndegoAsyncClient
-from .indego_client import IndegoClient
+
+__all__ = ["IndegoAsyncClient", "IndegoClient"]
+
+
+def __getattr__(name):
+    """Import the clients on first use, so the schedule and helpers import on their own."""
+    if name == "IndegoAsyncClient":
+        from .indego_async_client import IndegoAsyncClient  # pylint: disable=import-outside-toplevel
+
+        return IndegoAsyncClient
+    if name == "IndegoClient":
+        from .indego_client import IndegoClient  # pylint: disable=import-outside-toplevel
+
+        return IndegoClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
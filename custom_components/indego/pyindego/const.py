@@ -18,8 +18,43 @@ class Methods(Enum):
 DEFAULT_URL = "https://api.indego-cloud.iot.bosch-si.com/api/v1/"
 CONTENT_TYPE_JSON = "application/json"
 CONTENT_TYPE = "Content-Type"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 COMMANDS = ("mow", "pause", "returnToDock")
 
+# Seconds an endpoint refreshed by update_all stays fresh, 0 refreshes it on every call.
+ENDPOINT_REFRESH_INTERVALS = {
+    "state": 0,
+    "alerts": 300,
+    "operating_data": 300,
+    "calendar": 3600,
+    "predictive_calendar": 3600,
+    "predictive_schedule": 3600,
+    "next_mow": 3600,
+    "last_completed_mow": 3600,
+    "generic_data": 3600,
+    "updates_available": 3600,
+    "config": 86400,
+    "location": 86400,
+    "network": 86400,
+    "security": 86400,
+    "setup": 86400,
+    "user": 86400,
+}
+# Seconds update_all waits before retrying a failed endpoint, doubled with every failure in a row.
+ENDPOINT_RETRY_BACKOFF = 15
+ENDPOINT_RETRY_BACKOFF_MAX = 900
+# Endpoints to refresh on the next update_all when an endpoint changed.
+ENDPOINT_DEPENDENCIES = {
+    "state": ("alerts", "operating_data", "last_completed_mow", "next_mow"),
+    "calendar": ("next_mow", "predictive_schedule"),
+    "predictive_calendar": ("next_mow", "predictive_schedule"),
+    "generic_data": ("updates_available",),
+}
+# Only changes of these fields trigger the dependencies, the position of the mower changes all the time.
+ENDPOINT_DEPENDENCY_FIELDS = {
+    "state": ("state", "error", "mowmode", "enabled"),
+}
+
 DEFAULT_HEADERS = {
     CONTENT_TYPE: CONTENT_TYPE_JSON,
     # We need to change the user-agent!
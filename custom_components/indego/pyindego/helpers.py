@@ -2,41 +2,151 @@
 import logging
 import random
 import string
-from dataclasses import dataclass, is_dataclass, replace
+from collections import Counter
+from dataclasses import dataclass, field, fields, is_dataclass, replace
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
+from zoneinfo import ZoneInfo
 
 _LOGGER = logging.getLogger(__name__)
 
+# How often each unknown API field was seen, keyed by "<class>.<field>".
+UNKNOWN_FIELDS = Counter()
+
+
+def _compile_decoders(cls) -> tuple:
+    """Build the decoders for the nested dataclass fields of a class.
+
+    Returns (field name, decoder) pairs, only for the fields that hold a
+    dataclass or a list of dataclasses.
+    """
+    decoders = []
+    for name, field_type in cls.__annotations__.items():
+        if hasattr(field_type, "__args__"):
+            inner_type = field_type.__args__[0]
+            if is_dataclass(inner_type):
+                decoders.append((name, _list_decoder(inner_type)))
+        elif is_dataclass(field_type):
+            decoders.append((name, _object_decoder(field_type)))
+    return tuple(decoders)
+
+
+def _list_decoder(inner_type):
+    """Return a decoder for a list of dataclass dicts."""
+    build = _builder(inner_type)
+
+    def decode(value):
+        return [build(item) if isinstance(item, dict) else item for item in value]
+
+    return decode
+
+
+def _object_decoder(field_type):
+    """Return a decoder for a dataclass dict."""
+    build = _builder(field_type)
+
+    def decode(value):
+        return build(value) if isinstance(value, dict) else value
+
+    return decode
+
+
+def _builder(cls):
+    """Return a function building an instance of a dataclass from an API dict.
+
+    Classes wrapped by nested_dataclass handle unknown keys themselves. Flat
+    leaf classes are plain dataclasses, so their constructor is not wrapped
+    a second time; the unknown keys are dropped and counted here instead.
+    """
+    if getattr(cls, "__nested_dataclass__", False):
+        return lambda value: cls(**value)
+
+    field_names = frozenset(item.name for item in fields(cls))
+    init_names = frozenset(item.name for item in fields(cls) if item.init)
+
+    def build(value):
+        if init_names.issuperset(value):
+            return cls(**value)
+        unknown = value.keys() - field_names
+        if unknown:
+            _count_unknown_fields(cls.__name__, unknown)
+        # Computed (init=False) fields are dropped without counting them
+        return cls(**{key: item for key, item in value.items() if key in init_names})
+
+    return build
+
 
 def nested_dataclass(*args, **kwargs):  # noqa: D202
-    """Wrap a nested dataclass object."""
+    """Wrap a nested dataclass object.
+
+    The decoders for the nested fields are compiled once when the class is
+    created, constructing an instance only runs the decoders of fields that
+    are present.
+
+    Keys the class does not know are not passed to the constructor, they are
+    kept in the extra attribute and counted in UNKNOWN_FIELDS instead. This
+    way new fields in the Bosch API do not break the decoding. Values for
+    computed (init=False) fields are dropped. Flat leaf classes can stay
+    plain dataclasses, the decoder of their parent drops their unknown keys.
+    """
 
     def wrapper(cls):
+        cls.__annotations__["extra"] = dict
+        cls.extra = field(default=None, init=False, repr=False, compare=False)
         cls = dataclass(cls, **kwargs)
         original_init = cls.__init__
+        decoders = _compile_decoders(cls)
+        field_names = frozenset(item.name for item in fields(cls))
+        init_names = frozenset(item.name for item in fields(cls) if item.init)
 
         def __init__(self, *args, **kwargs):
-            for name, value in kwargs.items():
-                field_type = cls.__annotations__.get(name, None)
-                if hasattr(field_type, "__args__"):
-                    inner_type = field_type.__args__[0]
-                    if is_dataclass(inner_type):
-                        new_obj = [inner_type(**dict_) for dict_ in value]
-                        kwargs[name] = new_obj
-                else:
-                    if is_dataclass(field_type) and isinstance(value, dict):
-                        new_obj = field_type(**value)
-                        kwargs[name] = new_obj
+            extra = None
+            if not init_names.issuperset(kwargs):
+                for key in kwargs.keys() & (field_names - init_names):
+                    # Computed fields, the API value is not used.
+                    del kwargs[key]
+                unknown = kwargs.keys() - init_names
+                if unknown:
+                    extra = {key: kwargs.pop(key) for key in unknown}
+                    _count_unknown_fields(cls.__name__, extra)
+
+            for name, decode in decoders:
+                value = kwargs.get(name)
+                if value is not None:
+                    kwargs[name] = decode(value)
 
             original_init(self, *args, **kwargs)
+            if extra:
+                self.extra = extra
 
         cls.__init__ = __init__
+        cls.__nested_dataclass__ = True
         return cls
 
     return wrapper(args[0]) if args else wrapper
 
 
+def _count_unknown_fields(class_name: str, extra: dict):
+    """Count the unknown fields of an API payload."""
+    for key in extra:
+        counter_key = f"{class_name}.{key}"
+        UNKNOWN_FIELDS[counter_key] += 1
+        if UNKNOWN_FIELDS[counter_key] == 1:
+            _LOGGER.debug("Unknown field '%s' in %s API data, ignoring it", key, class_name)
+
+
+def unknown_field_counts() -> dict:
+    """Return how often each unknown API field was seen."""
+    return dict(UNKNOWN_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> ZoneInfo:
+    """Return the timezone with the given name, zoneinfo objects are loaded once."""
+    return ZoneInfo(name)
+
+
 def convert_bosch_datetime(dt: Any = None) -> datetime:
     """Create a datetime object from the string (or give back the datetime object) from Bosch. Checks if a valid number of milliseconds is sent."""
     if dt:
@@ -49,6 +159,19 @@ def convert_bosch_datetime(dt: Any = None) -> datetime:
     return None
 
 
+def selected_calendar(calendar_raw: dict) -> dict:
+    """Return the selected calendar from a calendar payload.
+
+    The API wraps the calendars in {"sel_cal": .., "cals": [..]}, payloads that
+    already hold a single calendar are returned as is.
+    """
+    cals = calendar_raw.get("cals")
+    if not cals:
+        return calendar_raw
+    sel_cal = calendar_raw.get("sel_cal")
+    return next((cal for cal in cals if cal.get("cal") == sel_cal), cals[0])
+
+
 def generate_update(field: Any, new: dict, new_class: Any):
     """Update a field to the new value, or instantiated the class and return the updated or new.
 
@@ -1,8 +1,13 @@
 """API for Bosch API server for Indego lawn mower."""
 import asyncio
+import hashlib
 import logging
 import json
+import os
+import random
 import time
+from contextvars import ContextVar
+from dataclasses import dataclass
 from socket import error as SocketError
 from typing import Any, Optional, Callable, Awaitable
 
@@ -20,14 +25,58 @@ from .const import (
     CONTENT_TYPE_JSON,
     DEFAULT_CALENDAR,
     DEFAULT_URL,
+    DOWNLOAD_CHUNK_SIZE,
     Methods,
 )
 from .indego_base_client import IndegoBaseClient
 from .states import Calendar
 from .helpers import random_request_id
+from .metrics import EndpointMetrics, MetricsRegistry
+from .scheduler import EndpointScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
+# Collects the failed requests of the endpoint refresh running in the current task.
+_REFRESH_FAILURES: ContextVar[Optional[list]] = ContextVar("refresh_failures", default=None)
+
+
+@dataclass
+class CachedResponse:
+    """Validators and parsed body of the last response for a path."""
+
+    etag: str = None
+    last_modified: str = None
+    digest: bytes = None
+    data: Any = None
+
+
+def _record_refresh_failure(path: str):
+    """Mark the endpoint refresh of the current task as failed."""
+    failures = _REFRESH_FAILURES.get()
+    if failures is not None:
+        failures.append(path)
+
+
+def _remove_file(filename: str):
+    """Remove a file, if it exists."""
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
+
+
+@dataclass
+class DownloadStats:
+    """Size and duration of a streamed download."""
+
+    size: int = 0
+    duration: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Return the average transfer rate."""
+        return self.size / self.duration if self.duration > 0 else float(self.size)
+
 
 class IndegoAsyncClient(IndegoBaseClient):
     """Class for Indego Async Client."""
@@ -41,6 +90,7 @@ class IndegoAsyncClient(IndegoBaseClient):
         api_url: str = DEFAULT_URL,
         session: aiohttp.ClientSession = None,
         raise_request_exceptions: bool = False,
+        trace_sample_rate: float = 1.0,
     ):
         """Initialize the Async Client."""
         super().__init__(token, token_refresh_method, serial, map_filename, api_url, raise_request_exceptions)
@@ -50,6 +100,11 @@ class IndegoAsyncClient(IndegoBaseClient):
         else:
             self._session = aiohttp.ClientSession(raise_for_status=False)
             self._should_close_session = True
+        self._response_cache: dict[str, CachedResponse] = {}
+        self.map_download_stats: Optional[DownloadStats] = None
+        self.trace_sample_rate = trace_sample_rate
+        self.metrics = MetricsRegistry(serial)
+        self.scheduler = EndpointScheduler()
 
     async def __aenter__(self):
         """Enter for async with."""
@@ -86,6 +141,7 @@ class IndegoAsyncClient(IndegoBaseClient):
             raise ValueError("Alerts not loaded, please run update_alerts first.")
         alert_id = self._get_alert_by_index(alert_index)
         if alert_id:
+            self.scheduler.invalidate("alerts", "alert deleted")
             return await self._request(Methods.DELETE, f"alerts/{alert_id}/")
 
     async def delete_all_alerts(self):
@@ -93,6 +149,7 @@ class IndegoAsyncClient(IndegoBaseClient):
         if not self._alerts_loaded:
             raise ValueError("Alerts not loaded, please run update_alerts first.")
         if self.alerts_count > 0:
+            self.scheduler.invalidate("alerts", "alert deleted")
             return await asyncio.gather(
                 *[
                     self._request(Methods.DELETE, f"alerts/{alert.alert_id}")
@@ -102,18 +159,22 @@ class IndegoAsyncClient(IndegoBaseClient):
         _LOGGER.info("No alerts to delete")
         return None
 
-    async def download_map(self, filename: str = None):
-        """Download the map."""
+    async def download_map(self, filename: str = None, atomic: bool = True) -> bool:
+        """Download the map, returns True when it was written.
+
+        Without atomic the map is written straight to filename, for callers
+        that pass a temporary file they move in place themselves.
+        """
         if not self.serial:
             return
         if filename:
             self.map_filename = filename
         if not self.map_filename:
             raise ValueError("No map filename defined.")
-        lawn_map = await self.get(f"alms/{self.serial}/map")
-        if lawn_map:
-            with open(self.map_filename, "wb") as file:
-                file.write(lawn_map)
+        self.map_download_stats = await self._download(
+            f"alms/{self.serial}/map", self.map_filename, atomic=atomic
+        )
+        return self.map_download_stats is not None
 
     async def put_alert_read(self, alert_index: int):
         """Set the alert to read."""
@@ -121,6 +182,7 @@ class IndegoAsyncClient(IndegoBaseClient):
             raise ValueError("Alerts not loaded, please run update_alerts first.")
         alert_id = self._get_alert_by_index(alert_index)
         if alert_id:
+            self.scheduler.invalidate("alerts", "alert read")
             return await self._request(
                 Methods.PUT, f"alerts/{alert_id}", data={"read_status": "read"}
             )
@@ -130,6 +192,7 @@ class IndegoAsyncClient(IndegoBaseClient):
         if not self._alerts_loaded:
             raise ValueError("Alerts not loaded, please run update_alerts first.")
         if self.alerts_count > 0:
+            self.scheduler.invalidate("alerts", "alert read")
             return await asyncio.gather(
                 *[
                     self._request(
@@ -160,6 +223,8 @@ class IndegoAsyncClient(IndegoBaseClient):
                 smartmow = command.lower() == "true"
             else:
                 smartmow = command
+            self.scheduler.invalidate("generic_data", "mow mode changed")
+            self.scheduler.invalidate("predictive_schedule", "mow mode changed")
             return await self.put(
                 f"alms/{self.serial}/predictive",
                 {"enabled": smartmow}
@@ -171,6 +236,7 @@ class IndegoAsyncClient(IndegoBaseClient):
         if not self.serial:
             return
         _LOGGER.debug("calendar: %s", calendar)
+        self.scheduler.invalidate("predictive_calendar", "calendar changed")
         return await self.put(
             f"alms/{self.serial}/predictive/calendar",
             calendar
@@ -188,28 +254,35 @@ class IndegoAsyncClient(IndegoBaseClient):
         await self.update_alerts()
         return self.alerts
 
-    async def update_all(self):
-        """Update all states."""
+    async def update_all(self, force: bool = False):
+        """Update the endpoints that are due, all of them with force.
+
+        Which endpoints are due is decided by the freshness policy of the
+        scheduler, the state is refreshed on every call.
+        """
+        due = self.scheduler.due(force)
         results = await asyncio.gather(
-            self.update_alerts(),
-            self.update_calendar(),
-            self.update_config(),
-            self.update_generic_data(),
-            self.update_last_completed_mow(),
-            self.update_location(),
-            self.update_network(),
-            self.update_next_mow(),
-            self.update_operating_data(),
-            self.update_predictive_calendar(),
-            self.update_predictive_schedule(),
-            self.update_security(),
-            self.update_setup(),
-            self.update_state(True),
-            self.update_updates_available(),
-            self.update_user(),
+            *(self._refresh_endpoint(name, reason) for name, reason in due.items()),
             return_exceptions=True,
         )
-        _LOGGER.debug("Update all results: %s", results)
+        _LOGGER.debug("Update all results: %s", dict(zip(due, results)))
+
+    async def _refresh_endpoint(self, name: str, reason: str):
+        """Refresh one endpoint for update_all and record it with the scheduler."""
+        failures = []
+        token = _REFRESH_FAILURES.set(failures)
+        previous = self._raw_payloads.get(name)
+        try:
+            if name == "state":
+                await self.update_state(True)
+            else:
+                await getattr(self, f"update_{name}")()
+        except Exception:
+            failures.append(name)
+            raise
+        finally:
+            _REFRESH_FAILURES.reset(token)
+            self.scheduler.refreshed(name, reason, not failures, previous, self._raw_payloads.get(name))
 
     async def update_calendar(self):
         """Update calendar."""
@@ -403,41 +476,66 @@ class IndegoAsyncClient(IndegoBaseClient):
     ):
         """Send a request."""
         url = self._api_url + path
+        headers = self._request_headers(headers)
 
-        # Ensure we have headers we want.
-        headers = self._headers if headers is None else {**self._headers, **headers}
-
-        if self._token:
-            headers["Authorization"] = "Bearer %s" % self._token
+        # Revalidate the previous response instead of downloading it again.
+        cached = self._response_cache.get(path) if method == Methods.GET else None
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
 
         request_id = random_request_id()
         request_start_time = None
+        trace_logger = self._trace_logger()
         try:
-            log_headers = headers.copy()
-            if 'Authorization' in log_headers:
-                log_headers['Authorization'] = '******'
-            _LOGGER.debug(
-                "[%s] %s call to API endpoint %s, headers: %s, data: %s",
-                request_id,
-                method.value,
-                url,
-                json.dumps(log_headers) if log_headers is not None else '',
-                json.dumps(data) if data is not None else '',
-            )
+            if trace_logger is not None:
+                log_headers = headers.copy()
+                if 'Authorization' in log_headers:
+                    log_headers['Authorization'] = '******'
+                trace_logger.debug(
+                    "[%s] %s call to API endpoint %s, headers: %s, data: %s",
+                    request_id,
+                    method.value,
+                    url,
+                    json.dumps(log_headers),
+                    json.dumps(data) if data is not None else '',
+                )
 
+            body = json.dumps(data).encode("utf-8") if data is not None else None
             request_start_time = time.time()
             async with self._session.request(
                 method.value,
                 url,
                 headers=headers,
-                json=data,
+                data=body,
                 timeout=aiohttp.ClientTimeout(total=timeout)
             ) as response:
                 if not response.ok:
+                    self.metrics.record_response(
+                        method.value, path, response.status, time.time() - request_start_time, 0, len(body or b"")
+                    )
                     response.raise_for_status()
 
+                if response.status == 304 and cached is not None:
+                    self.metrics.record_response(
+                        method.value, path, response.status, time.time() - request_start_time, 0, len(body or b"")
+                    ).cache_hits += 1
+                    _LOGGER.debug(
+                        "[%s] %s %s not modified in %i seconds",
+                        request_id,
+                        method.value,
+                        path,
+                        time.time() - request_start_time
+                    )
+                    return cached.data
+
                 if response.status == 204:
                     # API call successful but no content
+                    self.metrics.record_response(
+                        method.value, path, response.status, time.time() - request_start_time, 0, len(body or b"")
+                    )
                     _LOGGER.debug(
                         "[%s] %s %s successful in %i seconds, no content",
                         request_id,
@@ -449,23 +547,37 @@ class IndegoAsyncClient(IndegoBaseClient):
 
                 # Get response as raw bytes
                 response_content = await response.read()
-
-                # Log the timing and response
-                _LOGGER.debug(
-                    "[%s] %s %s successful in %i seconds: %s",
-                    request_id,
+                endpoint_metrics = self.metrics.record_response(
                     method.value,
                     path,
+                    response.status,
                     time.time() - request_start_time,
-                    response_content.decode('utf-8') if response.content_type == CONTENT_TYPE_JSON else "[binary content]"
+                    len(response_content),
+                    len(body or b""),
                 )
 
+                # Log the timing and response
+                if trace_logger is not None:
+                    trace_logger.debug(
+                        "[%s] %s %s successful in %i seconds: %s",
+                        request_id,
+                        method.value,
+                        path,
+                        time.time() - request_start_time,
+                        response_content.decode('utf-8') if response.content_type == CONTENT_TYPE_JSON else "[binary content]"
+                    )
+
                 # Parse response
                 if response.content_type == CONTENT_TYPE_JSON:
-                    return json.loads(response_content)
+                    return self._parse_json_response(
+                        method, path, response, response_content, cached, endpoint_metrics
+                    )
                 return response_content
 
         except asyncio.TimeoutError as exc:
+            _record_refresh_failure(path)
+            if request_start_time is not None:
+                self.metrics.record_failure(method.value, path, time.time() - request_start_time, timeout=True)
             if self._raise_request_exceptions:
                 raise
             _LOGGER.error(
@@ -479,6 +591,9 @@ class IndegoAsyncClient(IndegoBaseClient):
             return None
 
         except (TooManyRedirects, ClientResponseError, SocketError) as exc:
+            _record_refresh_failure(path)
+            if request_start_time is not None and not isinstance(exc, ClientResponseError):
+                self.metrics.record_failure(method.value, path, time.time() - request_start_time)
             if self._raise_request_exceptions:
                 raise
             _LOGGER.error(
@@ -492,10 +607,12 @@ class IndegoAsyncClient(IndegoBaseClient):
             return None
 
         except asyncio.CancelledError:
+            # Swallowing the cancellation would keep a cancelled task running.
             _LOGGER.debug("[%s] Task cancelled by task runner", request_id)
-            return None
+            raise
 
         except Exception as exc:
+            _record_refresh_failure(path)
             if self._raise_request_exceptions:
                 raise
             _LOGGER.error(
@@ -507,6 +624,145 @@ class IndegoAsyncClient(IndegoBaseClient):
             )
             return None
 
+    def _trace_logger(self) -> Optional[logging.Logger]:
+        """Return the logger to trace a request with, None when it is not traced.
+
+        Requests are traced on a child logger per mower, so debug logging can
+        be enabled for a single mower. Only a sample of the requests is traced
+        when trace_sample_rate is below 1.
+        """
+        trace_logger = _LOGGER.getChild(self._serial) if self._serial else _LOGGER
+        if not trace_logger.isEnabledFor(logging.DEBUG):
+            return None
+        if self.trace_sample_rate < 1 and random.random() >= self.trace_sample_rate:
+            return None
+        return trace_logger
+
+    def _request_headers(self, headers: dict = None) -> dict:
+        """Return the default headers merged with the given ones and the token."""
+        headers = {**self._headers, **headers} if headers else self._headers.copy()
+        if self._token:
+            headers["Authorization"] = "Bearer %s" % self._token
+        return headers
+
+    async def _download(
+        self, path: str, filename: str, timeout: int = 120, atomic: bool = True
+    ) -> Optional[DownloadStats]:
+        """Stream the body of a GET request to a file.
+
+        The chunks are written in the executor to a temporary file, which is
+        renamed to filename when the download completed, or without atomic
+        straight to filename. The body is never held in memory as a whole and
+        the event loop is not blocked by disk IO.
+        """
+        url = self._api_url + path
+        temp_filename = f"{filename}.part" if atomic else filename
+        loop = asyncio.get_running_loop()
+        request_id = random_request_id()
+        request_start_time = time.time()
+        file = None
+        completed = False
+        try:
+            _LOGGER.debug("[%s] GET call to API endpoint %s, streaming to %s", request_id, url, filename)
+            async with self._session.get(
+                url,
+                headers=self._request_headers(),
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                if not response.ok:
+                    self.metrics.record_response(
+                        Methods.GET.value, path, response.status, time.time() - request_start_time
+                    )
+                    response.raise_for_status()
+                if response.status == 204:
+                    self.metrics.record_response(
+                        Methods.GET.value, path, response.status, time.time() - request_start_time
+                    )
+                    _LOGGER.debug("[%s] GET %s successful, no content", request_id, path)
+                    return None
+
+                size = 0
+                file = await loop.run_in_executor(None, open, temp_filename, "wb")
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    await loop.run_in_executor(None, file.write, chunk)
+                    size += len(chunk)
+                await loop.run_in_executor(None, file.close)
+                file = None
+                self.metrics.record_response(
+                    Methods.GET.value, path, response.status, time.time() - request_start_time, size
+                )
+
+            if atomic:
+                await loop.run_in_executor(None, os.replace, temp_filename, filename)
+            completed = True
+            stats = DownloadStats(size=size, duration=time.time() - request_start_time)
+            _LOGGER.debug(
+                "[%s] GET %s streamed %i bytes in %.2f seconds (%.0f bytes/s)",
+                request_id,
+                path,
+                stats.size,
+                stats.duration,
+                stats.bytes_per_second,
+            )
+            return stats
+
+        except asyncio.CancelledError:
+            # Swallowing the cancellation would keep a cancelled task running.
+            _LOGGER.debug("[%s] Task cancelled by task runner", request_id)
+            raise
+
+        except Exception as exc:
+            if not isinstance(exc, ClientResponseError):
+                self.metrics.record_failure(
+                    Methods.GET.value,
+                    path,
+                    time.time() - request_start_time,
+                    timeout=isinstance(exc, asyncio.TimeoutError),
+                )
+            if self._raise_request_exceptions:
+                raise
+            _LOGGER.error(
+                "[%s] Streaming GET %s failed after %i seconds: %s",
+                request_id,
+                path,
+                time.time() - request_start_time,
+                str(exc)
+            )
+            return None
+
+        finally:
+            if file is not None:
+                await loop.run_in_executor(None, file.close)
+            if not completed:
+                await loop.run_in_executor(None, _remove_file, temp_filename)
+
+    def _parse_json_response(
+        self,
+        method: Methods,
+        path: str,
+        response: aiohttp.ClientResponse,
+        content: bytes,
+        cached: Optional[CachedResponse],
+        endpoint_metrics: EndpointMetrics,
+    ):
+        """Parse a JSON body, reusing the previous result when the body did not change."""
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        if cached is not None and cached.digest == digest:
+            endpoint_metrics.cache_hits += 1
+            data = cached.data
+        else:
+            endpoint_metrics.cache_misses += 1
+            data = json.loads(content)
+
+        if method == Methods.GET:
+            self._response_cache[path] = CachedResponse(
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                digest=digest,
+                data=data,
+            )
+        return data
+
     async def get(self, path: str, timeout: int = 30):
         """Send a GET request."""
         return await self._request(Methods.GET, path, timeout=timeout)
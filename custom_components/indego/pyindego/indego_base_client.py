@@ -1,9 +1,9 @@
 """Base class for indego."""
 import logging
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import Any, Optional, Callable, Awaitable
-
-import pytz
+from zoneinfo import ZoneInfoNotFoundError
 
 from .const import (
     DEFAULT_HEADERS,
@@ -13,7 +13,8 @@ from .const import (
     MOWER_STATE_DESCRIPTION_DETAIL,
     Methods,
 )
-from .helpers import convert_bosch_datetime, generate_update
+from .helpers import convert_bosch_datetime, generate_update, get_timezone, selected_calendar
+from .schedule import ScheduleIndex
 from .states import (
     Alert,
     Calendar,
@@ -62,6 +63,7 @@ class IndegoBaseClient(ABC):
         self.alerts = []
         self._alerts_loaded = False
         self.calendar = None
+        self.calendar_index = None
         self.config = None
         self.generic_data = None
         self.last_completed_mow = None
@@ -70,6 +72,7 @@ class IndegoBaseClient(ABC):
         self.next_mow = None
         self.operating_data = None
         self.predictive_calendar = None
+        self.predictive_calendar_index = None
         self.predictive_schedule = None
         self.security = None
         self.state = None
@@ -78,6 +81,37 @@ class IndegoBaseClient(ABC):
         self.update_available = False
         self.user = None
 
+        self._raw_payloads = {}
+        self.changed_fields = {}
+        # Upcoming mows by timezone name, valid until the first of them started
+        self._next_mows = {}
+
+    def _payload_changed(self, endpoint: str, raw: Any) -> bool:
+        """Return True when the raw payload of an endpoint differs from the applied one."""
+        previous = self._raw_payloads.get(endpoint)
+        return not (raw is previous or raw == previous)
+
+    def _payload_applied(self, endpoint: str, raw: Any):
+        """Remember the raw payload of an endpoint once its object was built from it.
+
+        A payload whose object could not be built is not remembered, so the
+        next identical payload is tried again. The keys that differ from the
+        previous payload are collected in changed_fields, an empty set means
+        the payload changed as a whole.
+        """
+        previous = self._raw_payloads.get(endpoint)
+        self._raw_payloads[endpoint] = raw
+
+        changed = self.changed_fields.setdefault(endpoint, set())
+        if isinstance(raw, dict) and isinstance(previous, dict):
+            changed.update(
+                key for key in raw.keys() | previous.keys() if raw.get(key) != previous.get(key)
+            )
+
+    def pop_changed_fields(self, endpoint: str) -> Optional[set]:
+        """Return and reset the changed keys of an endpoint, None when nothing changed."""
+        return self.changed_fields.pop(endpoint, None)
+
     def _get_alert_by_index(self, alert_index: int) -> str:
         """Get alert ID by index."""
         try:
@@ -92,86 +126,103 @@ class IndegoBaseClient(ABC):
 
     def _update_alerts(self, alerts_raw: list):
         """Update alerts."""
-        self.alerts = []
-        if alerts_raw:
-            for alert in alerts_raw:
-                self.alerts.append(Alert(**alert))
+        alerts_raw = alerts_raw or []
+        if self._payload_changed("alerts", alerts_raw):
+            self.alerts = [Alert(**alert) for alert in alerts_raw]
+            self._payload_applied("alerts", alerts_raw)
 
     def _update_calendar(self, calendar_raw):
-        """Update calendar."""
-        if calendar_raw:
-            self.calendar = Calendar(**calendar_raw)
+        """Update calendar and its schedule index."""
+        if calendar_raw and self._payload_changed("calendar", calendar_raw):
+            self.calendar = Calendar(**selected_calendar(calendar_raw))
+            self.calendar_index = ScheduleIndex.from_calendar(self.calendar)
+            self._payload_applied("calendar", calendar_raw)
 
     def _update_config(self, config_raw):
         """Update config."""
-        if config_raw:
+        if config_raw and self._payload_changed("config", config_raw):
             self.config = Config(**config_raw)
+            self._payload_applied("config", config_raw)
 
     def _update_generic_data(self, generic_data_raw):
         """Update generic data."""
-        if generic_data_raw:
+        if generic_data_raw and self._payload_changed("generic_data", generic_data_raw):
             self.generic_data = GenericData(**generic_data_raw)
+            self._payload_applied("generic_data", generic_data_raw)
 
     def _update_last_completed_mow(self, last_completed_raw):
         """Update last completed mow."""
-        if last_completed_raw:
+        if last_completed_raw and self._payload_changed("last_completed_mow", last_completed_raw):
             self.last_completed_mow = convert_bosch_datetime(last_completed_raw["last_mowed"])
+            self._payload_applied("last_completed_mow", last_completed_raw)
 
     def _update_location(self, location_raw):
         """Update location."""
-        if location_raw:
+        if location_raw and self._payload_changed("location", location_raw):
             self.location = Location(**location_raw)
+            self._payload_applied("location", location_raw)
 
     def _update_network(self, network_raw):
         """Update network."""
-        if network_raw:
+        if network_raw and self._payload_changed("network", network_raw):
             self.network = Network(**network_raw)
+            self._payload_applied("network", network_raw)
 
     def _update_next_mow(self, next_mow_raw):
         """Update next mow datetime."""
-        if next_mow_raw:
+        if next_mow_raw and self._payload_changed("next_mow", next_mow_raw):
             self.next_mow = convert_bosch_datetime(next_mow_raw["mow_next"])
+            self._payload_applied("next_mow", next_mow_raw)
 
     def _update_operating_data(self, operating_data_raw):
         """Update operating data."""
-        if operating_data_raw:
+        if operating_data_raw and self._payload_changed("operating_data", operating_data_raw):
             self.operating_data = OperatingData(**operating_data_raw)
+            self._payload_applied("operating_data", operating_data_raw)
 
     def _update_predictive_calendar(self, predictive_calendar_raw):
-        """Update predictive calendar."""
-        if predictive_calendar_raw:
-            self.predictive_calendar = Calendar(**predictive_calendar_raw)
+        """Update predictive calendar and its schedule index."""
+        if predictive_calendar_raw and self._payload_changed("predictive_calendar", predictive_calendar_raw):
+            self.predictive_calendar = Calendar(**selected_calendar(predictive_calendar_raw))
+            self.predictive_calendar_index = ScheduleIndex.from_calendar(self.predictive_calendar)
+            self._payload_applied("predictive_calendar", predictive_calendar_raw)
 
     def _update_predictive_schedule(self, predictive_schedule_raw):
         """Update predictive schedule."""
-        if predictive_schedule_raw:
+        if predictive_schedule_raw and self._payload_changed("predictive_schedule", predictive_schedule_raw):
             self.predictive_schedule = PredictiveSchedule(**predictive_schedule_raw)
+            self._payload_applied("predictive_schedule", predictive_schedule_raw)
 
     def _update_security(self, security_raw):
         """Update security."""
-        if security_raw:
+        if security_raw and self._payload_changed("security", security_raw):
             self.security = Security(**security_raw)
+            self._payload_applied("security", security_raw)
 
     def _update_setup(self, setup_raw):
         """Update setup."""
-        if setup_raw:
+        if setup_raw and self._payload_changed("setup", setup_raw):
             self.setup = Setup(**setup_raw)
+            self._payload_applied("setup", setup_raw)
 
     def _update_state(self, state_raw):
         """Update state."""
-        if state_raw:
+        if state_raw and self._payload_changed("state", state_raw):
             self.state = State(**state_raw)
             self.runtime = self.state.runtime
+            self._payload_applied("state", state_raw)
 
     def _update_updates_available(self, update_raw):
         """Update updates available."""
-        if update_raw:
+        if update_raw and self._payload_changed("updates_available", update_raw):
             self.update_available = update_raw.get("available", False)
+            self._payload_applied("updates_available", update_raw)
 
     def _update_user(self, user_raw):
         """Update users."""
-        if user_raw:
+        if user_raw and self._payload_changed("user", user_raw):
             self.user = User(**user_raw)
+            self._payload_applied("user", user_raw)
 
     def set_default_header(self, header: str, value: str):
         """Set headers to use for calls."""
@@ -215,26 +266,33 @@ class IndegoBaseClient(ABC):
         _LOGGER.warning("Please call update_state before calling this property")
         return None
 
+    def _upcoming_mows(self, timezone_name: Optional[str]) -> list:
+        """Return the slot starts of the week ahead, recomputed once the first of them started."""
+        now = datetime.now()
+        if timezone_name:
+            try:
+                now = datetime.now(get_timezone(timezone_name))
+            except (ZoneInfoNotFoundError, ValueError):
+                _LOGGER.debug("Unknown timezone %s, using the local time", timezone_name)
+        cached = self._next_mows.get(timezone_name)
+        if cached is None or cached[0] is not self.calendar_index or (cached[1] and cached[1][0] <= now):
+            cached = (self.calendar_index, self.calendar_index.upcoming(now))
+            self._next_mows[timezone_name] = cached
+        return cached[1]
+
     @property
     def next_mows(self):
         """Return the next mows from the calendar without a timezone."""
         if self.calendar:
-            return [
-                slot.dt for day in self.calendar.days for slot in day.slots if slot.dt
-            ]
+            return self._upcoming_mows(None)
         _LOGGER.warning("Please call update_calendar before calling this property")
         return None
 
     @property
     def next_mows_with_tz(self):
-        """Return the next mows from the calendar with timezone from location."""
+        """Return the next mows from the calendar in the timezone of the location."""
         if self.location and self.calendar:
-            return [
-                slot.dt.astimezone(pytz.timezone(self.location.timezone))
-                for day in self.calendar.days
-                for slot in day.slots
-                if slot.dt
-            ]
+            return self._upcoming_mows(self.location.timezone)
         if not self.location:
             _LOGGER.warning("Please call update_location before calling this property")
         if not self.calendar:
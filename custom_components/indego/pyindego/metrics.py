@@ -0,0 +1,183 @@
+"""Request metrics for the Bosch API."""
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Upper bounds of the latency histogram buckets in seconds, the last bucket is unbounded.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_ALERT_ID = re.compile(r"^alerts/[^/?]+")
+
+
+@dataclass(slots=True)
+class EndpointMetrics:
+    """Metrics of the HTTP requests to one endpoint."""
+
+    requests: int = 0
+    latency_buckets: list = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    status_codes: Counter = field(default_factory=Counter)
+    bytes_in: int = 0
+    bytes_out: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    last_request: Optional[float] = None
+
+    def observe_latency(self, latency: float):
+        """Add a request duration to the histogram."""
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        """Return the upper bound of the bucket holding the quantile, None without data."""
+        total = sum(self.latency_buckets)
+        if not total:
+            return None
+        rank = quantile * total
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.latency_max
+
+    def as_dict(self) -> dict:
+        """Return the metrics for diagnostics."""
+        observed = sum(self.latency_buckets)
+        return {
+            "requests": self.requests,
+            "latency_avg": round(self.latency_sum / observed, 3) if observed else None,
+            "latency_p50": self.latency_quantile(0.5),
+            "latency_p99": self.latency_quantile(0.99),
+            "latency_max": round(self.latency_max, 3),
+            "latency_histogram": dict(
+                zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], self.latency_buckets)
+            ),
+            "status_codes": dict(self.status_codes),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "last_request": self.last_request,
+        }
+
+
+@dataclass(slots=True)
+class RequestMetrics:
+    """Metrics of the requests by API manager request key."""
+
+    cache_hits: int = 0
+    cache_misses: int = 0
+    coalesced: int = 0
+    retries: int = 0
+    failures: int = 0
+
+    def as_dict(self) -> dict:
+        """Return the metrics for diagnostics."""
+        return {
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+
+class MetricsRegistry:
+    """Collect the request metrics of one client.
+
+    HTTP level metrics are kept per endpoint (method and path with the serial
+    and IDs replaced by placeholders). Cache and retry metrics of the layer
+    above the client are kept per request key.
+    """
+
+    def __init__(self, serial: str = None):
+        """Initialize the registry."""
+        self.serial = serial
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.requests: dict[str, RequestMetrics] = {}
+
+    def endpoint_name(self, method: str, path: str) -> str:
+        """Return the endpoint name of a request path."""
+        path, _, query = path.partition("?")
+        if self.serial:
+            path = path.replace(self.serial, "{serial}")
+        path = _ALERT_ID.sub("alerts/{id}", path)
+        if "longpoll=true" in query:
+            path += "?longpoll"
+        return f"{method} {path}"
+
+    def endpoint(self, method: str, path: str) -> EndpointMetrics:
+        """Return the metrics of the endpoint of a request."""
+        name = self.endpoint_name(method, path)
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def request(self, request_key: str) -> RequestMetrics:
+        """Return the metrics of a request key."""
+        metrics = self.requests.get(request_key)
+        if metrics is None:
+            metrics = self.requests[request_key] = RequestMetrics()
+        return metrics
+
+    def record_response(
+        self,
+        method: str,
+        path: str,
+        status: int,
+        latency: float,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+    ) -> EndpointMetrics:
+        """Record a completed HTTP request."""
+        metrics = self.endpoint(method, path)
+        metrics.requests += 1
+        metrics.status_codes[status] += 1
+        if status >= 400:
+            metrics.errors += 1
+        metrics.bytes_in += bytes_in
+        metrics.bytes_out += bytes_out
+        metrics.observe_latency(latency)
+        metrics.last_request = time.time()
+        return metrics
+
+    def record_failure(self, method: str, path: str, latency: float, timeout: bool = False):
+        """Record an HTTP request without response."""
+        metrics = self.endpoint(method, path)
+        metrics.requests += 1
+        if timeout:
+            metrics.timeouts += 1
+        else:
+            metrics.errors += 1
+        metrics.observe_latency(latency)
+        metrics.last_request = time.time()
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of HTTP requests."""
+        return sum(metrics.requests for metrics in self.endpoints.values())
+
+    @property
+    def total_errors(self) -> int:
+        """Return the number of HTTP requests that timed out, failed or got an error status."""
+        return sum(metrics.timeouts + metrics.errors for metrics in self.endpoints.values())
+
+    def as_dict(self) -> dict:
+        """Return all metrics for diagnostics."""
+        return {
+            "total_requests": self.total_requests,
+            "total_errors": self.total_errors,
+            "endpoints": {name: metrics.as_dict() for name, metrics in self.endpoints.items()},
+            "requests": {key: metrics.as_dict() for key, metrics in self.requests.items()},
+        }
@@ -0,0 +1,113 @@
+"""Weekly schedule index of a calendar."""
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def minute_of_week(dt: datetime) -> int:
+    """Return the minutes since Monday 00:00 of the week of dt."""
+    return dt.weekday() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+class ScheduleIndex:
+    """The enabled slots of a weekly calendar as sorted minute-of-week intervals.
+
+    Built once per calendar payload. The queries take the current time, so
+    the index stays correct across day and week boundaries without being
+    rebuilt. The times are wall clock times of the mower, pass datetimes in
+    its timezone. Overlapping slots are merged, a slot that ends before its
+    start runs past midnight.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals: List[tuple]):
+        """Initialize the index from (start, end) minute-of-week intervals."""
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        normalized = []
+        for start, end in intervals:
+            if start == end:
+                continue
+            start %= MINUTES_PER_WEEK
+            end %= MINUTES_PER_WEEK
+            if end <= start:
+                # Runs past midnight, from Sunday into the next week
+                end += MINUTES_PER_DAY if start - end < MINUTES_PER_DAY else MINUTES_PER_WEEK
+            normalized.append((start, end))
+
+        for start, end in sorted(normalized):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+        # A slot running into the next week swallows the Monday morning slots it overlaps
+        while len(self.starts) > 1 and self.starts[0] + MINUTES_PER_WEEK <= self.ends[-1]:
+            self.ends[-1] = max(self.ends[-1], self.ends[0] + MINUTES_PER_WEEK)
+            del self.starts[0], self.ends[0]
+
+    @classmethod
+    def from_calendar(cls, calendar) -> "ScheduleIndex":
+        """Build the index of the enabled slots of a Calendar."""
+        intervals = []
+        for day in calendar.days if calendar else ():
+            if day.day is None:
+                continue
+            for slot in day.slots:
+                if not slot.En or slot.StHr is None or slot.EnHr is None:
+                    continue
+                offset = day.day * MINUTES_PER_DAY
+                intervals.append(
+                    (
+                        offset + slot.StHr * 60 + (slot.StMin or 0),
+                        offset + slot.EnHr * 60 + (slot.EnMin or 0),
+                    )
+                )
+        return cls(intervals)
+
+    def __len__(self) -> int:
+        """Return the number of intervals."""
+        return len(self.starts)
+
+    def remaining_minutes(self, now: datetime) -> Optional[int]:
+        """Return the minutes left in the current slot, None outside of the slots."""
+        minute = minute_of_week(now)
+        position = bisect_right(self.starts, minute) - 1
+        if position >= 0 and minute < self.ends[position]:
+            return self.ends[position] - minute
+        if self.ends and minute + MINUTES_PER_WEEK < self.ends[-1]:
+            # In the part of the last slot of the week that runs into this one
+            return self.ends[-1] - minute - MINUTES_PER_WEEK
+        return None
+
+    def active(self, now: datetime) -> bool:
+        """Return True when now is inside a slot."""
+        return self.remaining_minutes(now) is not None
+
+    def next_start(self, now: datetime) -> Optional[datetime]:
+        """Return the start of the next slot after now."""
+        if not self.starts:
+            return None
+        minute = minute_of_week(now)
+        position = bisect_right(self.starts, minute)
+        start = self.starts[position] if position < len(self.starts) else self.starts[0] + MINUTES_PER_WEEK
+        return now.replace(second=0, microsecond=0) + timedelta(minutes=start - minute)
+
+    def upcoming(self, now: datetime, count: Optional[int] = None) -> List[datetime]:
+        """Return the starts of the slots in the week after now, the first one first."""
+        minute = minute_of_week(now)
+        position = bisect_right(self.starts, minute)
+        total = len(self.starts)
+        count = total if count is None else min(count, total)
+        base = now.replace(second=0, microsecond=0)
+        upcoming = []
+        for index in range(position, position + count):
+            # Past the last slot of the week the slots of the next week follow
+            start = self.starts[index] if index < total else self.starts[index - total] + MINUTES_PER_WEEK
+            upcoming.append(base + timedelta(minutes=start - minute))
+        return upcoming
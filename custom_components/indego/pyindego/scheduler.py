@@ -0,0 +1,164 @@
+"""Freshness policy for the endpoints refreshed by update_all."""
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from .const import (
+    ENDPOINT_DEPENDENCIES,
+    ENDPOINT_DEPENDENCY_FIELDS,
+    ENDPOINT_REFRESH_INTERVALS,
+    ENDPOINT_RETRY_BACKOFF,
+    ENDPOINT_RETRY_BACKOFF_MAX,
+)
+
+# Refresh reasons
+REASON_STARTUP = "startup"
+REASON_FORCED = "forced"
+REASON_CONTINUOUS = "continuous"
+REASON_EXPIRED = "expired"
+REASON_RETRY = "retry"
+REASON_INVALIDATED = "invalidated"
+
+RECENT_REFRESHES = 50
+
+
+@dataclass(slots=True)
+class EndpointSchedule:
+    """Refresh bookkeeping of one endpoint."""
+
+    interval: float
+    last_refresh: Optional[float] = None
+    last_failed: bool = False
+    invalidated: Optional[str] = None
+    reasons: Counter = field(default_factory=Counter)
+    failures: int = 0
+    failures_in_row: int = 0
+    retry_at: Optional[float] = None
+
+
+class EndpointScheduler:
+    """Decide which endpoints update_all refreshes.
+
+    Every endpoint has a refresh interval. An endpoint is due when it was
+    never loaded, its interval expired, its last refresh failed or it was
+    invalidated, by a command that changes it or by a change of an endpoint
+    it depends on. The reason of every refresh is recorded.
+
+    A failed endpoint is retried after a backoff that doubles with every
+    failure in a row, up to the maximum and never beyond its interval.
+    """
+
+    def __init__(
+        self,
+        intervals: dict = None,
+        dependencies: dict = None,
+        dependency_fields: dict = None,
+        clock: Callable[[], float] = time.monotonic,
+        retry_backoff: float = ENDPOINT_RETRY_BACKOFF,
+        retry_backoff_max: float = ENDPOINT_RETRY_BACKOFF_MAX,
+    ):
+        """Initialize the scheduler."""
+        self._clock = clock
+        self._retry_backoff = retry_backoff
+        self._retry_backoff_max = retry_backoff_max
+        self._dependencies = ENDPOINT_DEPENDENCIES if dependencies is None else dependencies
+        self._dependency_fields = ENDPOINT_DEPENDENCY_FIELDS if dependency_fields is None else dependency_fields
+        self.endpoints = {
+            name: EndpointSchedule(interval)
+            for name, interval in (ENDPOINT_REFRESH_INTERVALS if intervals is None else intervals).items()
+        }
+        self.recent = deque(maxlen=RECENT_REFRESHES)
+
+    def due(self, force: bool = False) -> dict[str, str]:
+        """Return the endpoints to refresh now with the reason."""
+        now = self._clock()
+        due = {}
+        for name, schedule in self.endpoints.items():
+            if force:
+                due[name] = REASON_FORCED
+            elif schedule.retry_at is not None and now < schedule.retry_at:
+                # Failed, back off before the retry
+                continue
+            elif schedule.last_refresh is None:
+                due[name] = REASON_STARTUP
+            elif schedule.invalidated:
+                due[name] = f"{REASON_INVALIDATED}: {schedule.invalidated}"
+            elif schedule.last_failed:
+                due[name] = REASON_RETRY
+            elif not schedule.interval:
+                due[name] = REASON_CONTINUOUS
+            elif now - schedule.last_refresh >= schedule.interval:
+                due[name] = REASON_EXPIRED
+        return due
+
+    def invalidate(self, name: str, reason: str):
+        """Refresh an endpoint on the next update_all."""
+        schedule = self.endpoints.get(name)
+        if schedule is not None and not schedule.invalidated:
+            schedule.invalidated = reason
+
+    def refreshed(self, name: str, reason: str, success: bool, previous: Any = None, current: Any = None):
+        """Record a refresh, invalidates the dependent endpoints when the payload changed."""
+        schedule = self.endpoints[name]
+        schedule.reasons[reason.split(":")[0]] += 1
+        self.recent.append((time.time(), name, reason, success))
+        now = self._clock()
+        if not success:
+            schedule.failures += 1
+            schedule.failures_in_row += 1
+            schedule.last_failed = True
+            schedule.retry_at = now + self._backoff(schedule)
+            if schedule.last_refresh is None:
+                # Not loaded yet, retry after the backoff without waiting for the interval.
+                return
+        else:
+            schedule.last_failed = False
+            schedule.failures_in_row = 0
+            schedule.retry_at = None
+            schedule.invalidated = None
+        schedule.last_refresh = now
+
+        if success and current is not previous and self._changed(name, previous, current):
+            for dependency in self._dependencies.get(name, ()):
+                self.invalidate(dependency, f"{name} changed")
+
+    def _backoff(self, schedule: EndpointSchedule) -> float:
+        """Return the seconds to wait before retrying a failed endpoint."""
+        backoff = min(self._retry_backoff * 2 ** (schedule.failures_in_row - 1), self._retry_backoff_max)
+        if schedule.interval:
+            # A failed endpoint is not retried later than its next regular refresh.
+            backoff = min(backoff, schedule.interval)
+        return backoff
+
+    def _changed(self, name: str, previous: Any, current: Any) -> bool:
+        """Return True when the payload changed in a field the dependencies care about."""
+        if previous is None:
+            # The first load is no change, every endpoint loads at startup anyway.
+            return False
+        fields = self._dependency_fields.get(name)
+        if not fields or not isinstance(previous, dict) or not isinstance(current, dict):
+            return True
+        return any(previous.get(key) != current.get(key) for key in fields)
+
+    def as_dict(self) -> dict:
+        """Return the schedule for diagnostics."""
+        now = self._clock()
+        return {
+            "endpoints": {
+                name: {
+                    "interval": schedule.interval,
+                    "age": round(now - schedule.last_refresh, 1) if schedule.last_refresh is not None else None,
+                    "last_failed": schedule.last_failed,
+                    "invalidated": schedule.invalidated,
+                    "refreshes": dict(schedule.reasons),
+                    "failures": schedule.failures,
+                    "retry_in": round(max(schedule.retry_at - now, 0), 1) if schedule.retry_at is not None else None,
+                }
+                for name, schedule in self.endpoints.items()
+            },
+            "recent": [
+                {"time": timestamp, "endpoint": name, "reason": reason, "success": success}
+                for timestamp, name, reason, success in self.recent
+            ],
+        }
@@ -1,7 +1,7 @@
 """Classes for states of pyIndego."""
 import logging
 from dataclasses import dataclass, field
-from datetime import date, datetime, time, timedelta
+from datetime import datetime, time
 from typing import List
 
 from .const import (
@@ -13,7 +13,7 @@ from .helpers import convert_bosch_datetime, nested_dataclass
 _LOGGER = logging.getLogger(__name__)
 
 
-@dataclass
+@nested_dataclass
 class Alert:
     """Alert class."""
 
@@ -60,7 +60,7 @@ MOWER_MODEL_VOLTAGE = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class Battery:
     """Battery Class."""
 
@@ -80,7 +80,7 @@ class Battery:
             )
 
 
-@dataclass
+@dataclass(slots=True)
 class CalendarSlot:
     """Class for CalendarSlots."""
 
@@ -92,7 +92,6 @@ class CalendarSlot:
     Attr: str = None
     start: time = None
     end: time = None
-    dt: datetime = None
 
     def __post_init__(self):
         """Convert start and end in time format."""
@@ -112,34 +111,18 @@ DAY_MAPPING = {
     6: "Sunday"
 }
 
-@nested_dataclass
+@nested_dataclass(slots=True)
 class CalendarDay:
     """Class for CalendarDays."""
 
     day: int = None
     day_name: str = None
-    slots: List[CalendarSlot] = field(default_factory=lambda: [CalendarSlot])
+    slots: List[CalendarSlot] = field(default_factory=list)
 
     def __post_init__(self):
         """Update the dayname."""
         if self.day is not None:
             self.day_name = DAY_MAPPING[self.day]
-        if self.slots:
-            for slot in self.slots:
-                if slot.En:
-                    today = date.today().weekday()
-                    date_offset = timedelta(
-                        days=self.day - today, hours=slot.StHr, minutes=slot.StMin
-                    )
-                    new_dt = (
-                        datetime.now().replace(
-                            hour=0, minute=0, second=0, microsecond=0
-                        )
-                        + date_offset
-                    )
-                    if new_dt.date() < date.today():
-                        new_dt = new_dt + timedelta(days=7)
-                    slot.dt = new_dt
 
 
 @nested_dataclass
@@ -147,15 +130,15 @@ class Calendar:
     """Class for Calendar."""
 
     cal: int = None
-    days: List[CalendarDay] = field(default_factory=lambda: [CalendarDay])
+    days: List[CalendarDay] = field(default_factory=list)
 
 
 @nested_dataclass
 class PredictiveSchedule:
     """Class for PredictiveSchedule."""
 
-    schedule_days: List[CalendarDay] = field(default_factory=lambda: [CalendarDay])
-    exclusion_days: List[CalendarDay] = field(default_factory=lambda: [CalendarDay])
+    schedule_days: List[CalendarDay] = field(default_factory=list)
+    exclusion_days: List[CalendarDay] = field(default_factory=list)
 
 
 @nested_dataclass
@@ -188,7 +171,7 @@ class GenericData:
         self.renew_date = convert_bosch_datetime(self.renew_date)
 
 
-@dataclass
+@nested_dataclass
 class Location:
     """Location Class."""
 
@@ -197,7 +180,7 @@ class Location:
     timezone: str = None
 
 
-@dataclass
+@nested_dataclass
 class Network:
     """Network Class."""
 
@@ -211,7 +194,7 @@ class Network:
     networks: List[int] = None
 
 
-@dataclass
+@nested_dataclass
 class Config:
     """Config Class."""
 
@@ -224,7 +207,7 @@ class Config:
     alarm_mode: bool = None
 
 
-@dataclass
+@nested_dataclass
 class Setup:
     """Setup Class."""
 
@@ -235,7 +218,7 @@ class Setup:
     hasIntegrityCheckPassed: bool = None
 
 
-@dataclass
+@nested_dataclass
 class Security:
     """Security Class."""
 
@@ -243,7 +226,7 @@ class Security:
     autolock: bool = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RuntimeDetail:
     """Runtime Details Class."""
 
@@ -256,7 +239,7 @@ class RuntimeDetail:
         self.cut = round(self.operate - self.charge)
 
 
-@nested_dataclass
+@nested_dataclass(slots=True)
 class Runtime:  # pylint: disable=no-member,assigning-non-slot
     """Runtime Class."""
 
@@ -277,7 +260,7 @@ class Runtime:  # pylint: disable=no-member,assigning-non-slot
             self.session.cut = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Garden:
     """Garden Class."""
 
@@ -295,7 +278,7 @@ class Garden:
     map_cell_size: int = None
 
 
-@nested_dataclass
+@nested_dataclass(slots=True)
 class OperatingData:
     """Operating Data Class."""
 
@@ -305,7 +288,7 @@ class OperatingData:
     runtime: Runtime = field(default_factory=Runtime)
 
 
-@nested_dataclass
+@nested_dataclass(slots=True)
 class State:
     """State Class."""
 
@@ -327,7 +310,7 @@ class State:
     enabled: bool = None
 
 
-@dataclass
+@nested_dataclass
 class User:
     """User Class."""
 
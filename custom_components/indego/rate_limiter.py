@@ -0,0 +1,195 @@
+"""Token bucket rate limiter for the Bosch Indego API."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    API_RATE_LIMIT_REQUESTS,
+    API_RATE_LIMIT_WINDOW,
+    DATA_RATE_LIMITERS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Return the number of seconds to wait from a Retry-After header value."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        _LOGGER.debug("Unable to parse Retry-After header: %s", value)
+        return default
+    return max((retry_at - dt_util.utcnow()).total_seconds(), 0)
+
+
+def account_id_from_token(access_token: Optional[str]) -> Optional[str]:
+    """Return the Bosch account ID from the claims of an OAuth access token."""
+    if not access_token or access_token.count(".") != 2:
+        return None
+    payload = access_token.split(".")[1]
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (ValueError, TypeError):
+        return None
+    return claims.get("oid") or claims.get("sub")
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate to the Bosch API.
+
+    The bucket only keeps the token count and the time of the last refill,
+    waiters are woken by a single loop timer at the moment a token frees up.
+    """
+
+    def __init__(
+        self,
+        capacity: int = API_RATE_LIMIT_REQUESTS,
+        period: timedelta = API_RATE_LIMIT_WINDOW,
+    ):
+        """Initialize the token bucket."""
+        self._capacity = capacity
+        self._rate = capacity / period.total_seconds()
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill."""
+        if now > self._updated:
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+    def _delay(self, now: float) -> float:
+        """Return the number of seconds until the next token is available."""
+        delay = max(self._blocked_until - now, 0)
+        if self._tokens < 1:
+            delay = max(delay, (1 - self._tokens) / self._rate)
+        return delay
+
+    @property
+    def available(self) -> float:
+        """Return the number of tokens currently available."""
+        now = time.monotonic()
+        self._refill(now)
+        if self._blocked_until > now:
+            return 0
+        return self._tokens
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def try_acquire(self) -> bool:
+        """Take a token without waiting, return False when none is available."""
+        now = time.monotonic()
+        self._refill(now)
+        if self._waiters or self._delay(now) > 0:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a token, return False when the timeout expired first."""
+        if self.try_acquire():
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._schedule_wakeup()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    @callback
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Adjust the bucket to the rate limit headers of an API response."""
+        if not headers:
+            return
+        now = time.monotonic()
+        self._refill(now)
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            try:
+                self._tokens = min(self._tokens, float(remaining))
+            except ValueError:
+                _LOGGER.debug("Unable to parse X-RateLimit-Remaining header: %s", remaining)
+
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None:
+            delay = parse_retry_after(retry_after, 0)
+            if delay > 0:
+                _LOGGER.debug("API asked to back off for %.1f seconds", delay)
+                self._blocked_until = max(self._blocked_until, now + delay)
+                self._tokens = min(self._tokens, 0)
+
+        if self._waiters and self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+            self._schedule_wakeup()
+
+    def _schedule_wakeup(self) -> None:
+        """Schedule the timer for the next waiter."""
+        if self._wakeup is not None or not self._waiters:
+            return
+        now = time.monotonic()
+        self._refill(now)
+        self._wakeup = asyncio.get_running_loop().call_later(self._delay(now), self._wake)
+
+    def _wake(self) -> None:
+        """Hand out tokens to waiters in arrival order."""
+        self._wakeup = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            if self._waiters[0].done():
+                self._waiters.popleft()
+                continue
+            if self._delay(now) > 0:
+                break
+            self._tokens -= 1
+            self._waiters.popleft().set_result(None)
+        self._schedule_wakeup()
+
+    def as_dict(self) -> dict:
+        """Return the limiter state for diagnostics."""
+        return {
+            "capacity": self._capacity,
+            "available": round(self.available, 2),
+            "waiting": self.waiting,
+            "blocked_for": round(max(self._blocked_until - time.monotonic(), 0), 1),
+        }
+
+
+@callback
+def async_get_rate_limiter(hass: HomeAssistant, account_id: Optional[str] = None) -> TokenBucket:
+    """Return the rate limiter shared by all config entries of a Bosch account."""
+    if account_id is None:
+        return TokenBucket()
+
+    limiters: dict[str, TokenBucket] = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    if account_id not in limiters:
+        limiters[account_id] = TokenBucket()
+    return limiters[account_id]
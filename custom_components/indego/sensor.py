@@ -1,7 +1,7 @@
 """Class for Indego Sensors."""
 import logging
 
-from homeassistant.components.sensor import SensorEntity, ENTITY_ID_FORMAT as SENSOR_FORMAT, SensorEntityDescription
+from homeassistant.components.sensor import SensorEntity, ENTITY_ID_FORMAT as SENSOR_FORMAT, SensorEntityDescription, SensorStateClass
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
@@ -11,7 +11,7 @@ from homeassistant.helpers.entity import DeviceInfo
 
 from homeassistant.const import TIME_MINUTES, AREA_SQUARE_METERS
 from .mixins import IndegoEntity
-from .const import DATA_UPDATED, DOMAIN, ENTITY_BATTERY_CYCLES, ENTITY_AVERAGE_MOW_TIME, ENTITY_WEEKLY_AREA
+from .const import DATA_UPDATED, DOMAIN, ENTITY_BATTERY_CYCLES, ENTITY_AVERAGE_MOW_TIME, ENTITY_WEEKLY_AREA, ENTITY_API_REQUESTS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +34,11 @@ INDEGO_SENSORS: tuple[SensorEntityDescription, ...] = (
         icon="mdi:texture-box",
         native_unit_of_measurement=AREA_SQUARE_METERS,
     ),
+    SensorEntityDescription(
+        key=ENTITY_API_REQUESTS,
+        name="API Requests",
+        icon="mdi:api",
+    ),
 )
 
 
@@ -78,6 +83,16 @@ async def async_setup_entry(
                     indego_hub.device_info,
                 )
             )
+        elif description.key == ENTITY_API_REQUESTS:
+            entities.append(
+                IndegoApiRequestsSensor(
+                    f"{indego_hub.name}_{description.key}",
+                    description.name,
+                    description.icon,
+                    indego_hub.device_info,
+                    indego_hub,
+                )
+            )
 
     async_add_entities(entities, True)
 
@@ -129,6 +144,10 @@ class IndegoSensor(IndegoEntity, SensorEntity):
             self._state = new
             self.async_schedule_update_ha_state()
 
+    def _data_changed(self, data_class: str) -> bool:
+        """Return True when the last coordinator push carried a new payload of the data class."""
+        return data_class in self._indego_hub.coordinator.data.get("changed", ())
+
     @property
     def device_class(self) -> str:
         """Return device class."""
@@ -161,6 +180,8 @@ class IndegoBatteryCyclesSensor(IndegoSensor):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self._data_changed("operating_data"):
+            return
         if op_data := self._indego_hub.coordinator.data.get("operating_data"):
             self.state = op_data.battery.cycles
         super()._handle_coordinator_update()
@@ -176,6 +197,8 @@ class IndegoAverageMowTimeSensor(IndegoSensor):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self._data_changed("operating_data"):
+            return
         self.state = 0
         if op_data := self._indego_hub.coordinator.data.get("operating_data"):
             total_mowing_time = op_data.runtime.total_mowing
@@ -195,7 +218,40 @@ class IndegoWeeklyAreaSensor(IndegoSensor):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self._data_changed("operating_data"):
+            return
         self.state = 0
         if op_data := self._indego_hub.coordinator.data.get("operating_data"):
             self.state = op_data.garden.get("weekly_mowing", 0)
         super()._handle_coordinator_update()
+
+
+class IndegoApiRequestsSensor(IndegoSensor):
+    """Sensor for the Bosch API requests, with the latency per endpoint as attributes."""
+
+    # The breakdown changes with every request, keep it out of the recorder
+    _unrecorded_attributes = IndegoSensor._unrecorded_attributes | {"endpoints"}
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, entity_id, name, icon, device_info: DeviceInfo, indego_hub):
+        """Initialize the sensor."""
+        super().__init__(entity_id, name, icon, None, None, None, device_info)
+        self._indego_hub = indego_hub
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        metrics = self._indego_hub._async_client.metrics
+        self._attr = {
+            "endpoints": {
+                name: {
+                    "requests": endpoint.requests,
+                    "latency_p50": endpoint.latency_quantile(0.5),
+                    "latency_p99": endpoint.latency_quantile(0.99),
+                    "errors": endpoint.errors + endpoint.timeouts,
+                }
+                for name, endpoint in metrics.endpoints.items()
+            }
+        }
+        self.state = metrics.total_requests
+        super()._handle_coordinator_update()